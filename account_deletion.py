@@ -0,0 +1,50 @@
+# account_deletion.py
+"""
+Background job behind DELETE /users/me.
+
+The request only deactivates the account and queues this job (crud.deactivate_user).
+The job then deletes the user's blogs and careers ACCOUNT_DELETE_BATCH_SIZE
+rows at a time, one short transaction per batch, and removes their images and
+resumes with multi-object deletes. It deletes the user row last.
+
+Rows are deleted before their files. If the process dies in between, the files
+are orphaned, but nothing ever points at a missing object. Files still used by
+other rows are kept (content_store.py reference counts). Files reused within
+the grace period, and keys S3 refuses, are left for storage_gc.py.
+"""
+import os
+
+import content_store
+import crud
+import jobs
+from database import SessionLocal
+from s3_utils import storage as blogs_storage
+from aws_utils import storage as career_storage
+
+ACCOUNT_DELETE_BATCH_SIZE = int(os.getenv("ACCOUNT_DELETE_BATCH_SIZE", "1000"))  # rows per transaction (and per S3 delete call)
+
+async def _delete_in_batches(job, user_id: int, delete_batch, store, rows_counter: str):
+    while True:
+        async with SessionLocal() as db:
+            rows, freed = await delete_batch(db, user_id, ACCOUNT_DELETE_BATCH_SIZE)
+        if not rows:
+            return
+        deleted, failed = await content_store.release(store, freed)
+        p = job.progress
+        await job.update(**{
+            rows_counter: p.get(rows_counter, 0) + rows,
+            "files_deleted": p.get("files_deleted", 0) + len(deleted),
+            "files_failed": p.get("files_failed", 0) + len(failed),
+            "files_deferred": p.get("files_deferred", 0) + len(set(freed)) - len(deleted) - len(failed),
+        })
+        if failed:
+            print(f"Job {job.id}: could not delete {len(failed)} file(s), e.g. {failed[0]}")
+
+@jobs.handler("account_deletion")
+async def delete_account(job, params: dict):
+    user_id = params["user_id"]
+    await _delete_in_batches(job, user_id, crud.delete_user_blogs_batch, blogs_storage, "blogs_deleted")
+    await _delete_in_batches(job, user_id, crud.delete_user_careers_batch, career_storage, "careers_deleted")
+    async with SessionLocal() as db:
+        await crud.delete_user(db, user_id)
+    await job.update(user_deleted=True)
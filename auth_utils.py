@@ -1,12 +1,20 @@
 # auth_utils.py
+import hashlib
+import hmac
+import math
+import os
+import time
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from database import get_db
+from starlette.datastructures import MutableHeaders
+import database
+from database import get_db, read_session
+from hashing import pwd_context, verify_password_sync, hash_password_sync
+from cache_utils import TTLCache
 import models
 
 # ----------------------
@@ -16,7 +24,9 @@ SECRET_KEY = "41f2e5f551c9692e3921d826c1f1cddf5be6b3ab917ca24da9ae62c5311e44a7"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Decoded tokens and user rows are cached per process for this long (0 disables)
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "30"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -24,11 +34,13 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 # ----------------------
 # Password utils
 # ----------------------
+# Blocking versions, for scripts only. Request handlers must use the pooled
+# `hash_password` / `verify_and_update_password` from hashing.py.
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_password_sync(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return hash_password_sync(password)
 
 # ----------------------
 # JWT utils
@@ -39,10 +51,27 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+# ----------------------
+# Auth cache (token -> username, username -> user row)
+# ----------------------
+_token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE)
+_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE)
+
+def _detached_copy(user: models.User) -> models.User:
+    # Cache a session-free copy so no request can touch another request's session
+    return models.User(**{c.key: getattr(user, c.key) for c in models.User.__table__.columns})
+
+def invalidate_user(*usernames: str | None):
+    """Drop cached user rows; call after any change to a user (update, delete, password)."""
+    for username in usernames:
+        if username:
+            _user_cache.pop(username)
+
 # ----------------------
 # Get current user (STRICT, required for all private routes)
 # ----------------------
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db),
 ):
@@ -53,30 +82,104 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if not username:
+    username = _token_cache.get(token)
+    if username is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username: str = payload.get("sub")
+            if not username:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid authentication token",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+        except JWTError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
+                detail="Invalid or expired token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # Never cache a token past its own expiry
+        _token_cache.set(token, username, min(AUTH_CACHE_TTL, payload.get("exp", 0) - time.time()))
 
-    result = await db.execute(select(models.User).where(models.User.username == username))
-    user = result.scalar_one_or_none()
+    user = _user_cache.get(username)
+    if user is None:
+        result = await db.execute(select(models.User).where(models.User.username == username))
+        user = result.scalar_one_or_none()
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User no longer exists",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        # is_active is False while an account deletion job runs
+        if not user or user.is_active is False:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User no longer exists",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
 
+        user = _detached_copy(user)
+        _user_cache.set(username, user, AUTH_CACHE_TTL)
+
+    request.state.user_id = user.id  # read-replica stickiness, see database.get_db
     return user
+
+# ----------------------
+# Read-only DB session for GET handlers (replica when configured)
+# ----------------------
+async def get_read_db(current_user: models.User = Depends(get_current_user)):
+    async with read_session(current_user.id) as session:
+        yield session
+
+# ----------------------
+# Read-your-writes across worker processes
+# ----------------------
+STICKY_COOKIE = "db_sticky"
+
+def _sticky_signature(payload: str) -> str:
+    return hmac.new(SECRET_KEY.encode(), f"{STICKY_COOKIE}:{payload}".encode(), hashlib.sha256).hexdigest()[:32]
+
+def _sticky_cookie_value(user_id: int) -> str:
+    payload = f"{user_id}.{int(time.time() + database.DB_REPLICA_STICKY_SECONDS)}"
+    return f"{payload}.{_sticky_signature(payload)}"
+
+def _sticky_user(value: str | None) -> int | None:
+    """User id from an unexpired, correctly signed stickiness cookie."""
+    try:
+        user_id, expires, signature = value.split(".")
+        if not hmac.compare_digest(signature, _sticky_signature(f"{user_id}.{expires}")) or int(expires) < time.time():
+            return None
+        return int(user_id)
+    except (AttributeError, ValueError):
+        return None
+
+class ReadYourWritesMiddleware:
+    """
+    A response to a request that committed on the primary sets a short-lived
+    signed cookie; while a request carries it, that user's reads skip the
+    replicas on whichever worker serves them (database.mark_write only pins
+    the worker that saw the write).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not database.ReplicaSessions:
+            return await self.app(scope, receive, send)
+
+        state = {"committed": False, "sticky_user": _sticky_user(Request(scope).cookies.get(STICKY_COOKIE))}
+
+        async def send_wrapper(message):
+            user_id = scope.get("state", {}).get("user_id")  # set by get_current_user
+            if message["type"] == "http.response.start" and state["committed"] and user_id is not None:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_COOKIE}={_sticky_cookie_value(user_id)}; Max-Age={math.ceil(database.DB_REPLICA_STICKY_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        token = database.request_consistency.set(state)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            database.request_consistency.reset(token)
@@ -1,7 +1,7 @@
 # aws_utils.py
-import boto3
 import os
-from uuid import uuid4
+from storage import create_storage
+import content_store
 
 # read env
 CAREER_BUCKET = os.getenv("CAREER_S3_BUCKET", "mybucket")
@@ -10,47 +10,27 @@ CAREER_ACCESS_KEY = os.getenv("CAREER_AWS_ACCESS_KEY_ID", "test")
 CAREER_SECRET_KEY = os.getenv("CAREER_AWS_SECRET_ACCESS_KEY", "test")
 CAREER_ENDPOINT = os.getenv("CAREER_S3_ENDPOINT_URL", "http://localstack:4566")
 
-# Career S3 client
-s3 = boto3.client(
-    "s3",
-    region_name=CAREER_REGION,
-    aws_access_key_id=CAREER_ACCESS_KEY,
-    aws_secret_access_key=CAREER_SECRET_KEY,
-    endpoint_url=CAREER_ENDPOINT
-)
+# Career storage (S3 or local filesystem, see storage.STORAGE_BACKEND); the client is created lazily
+storage = create_storage(CAREER_BUCKET, CAREER_REGION, CAREER_ACCESS_KEY, CAREER_SECRET_KEY, CAREER_ENDPOINT)
 
-def init_s3():
+async def init_s3():
     """Initialize Career S3 bucket if not exists"""
-    existing_buckets = [b["Name"] for b in s3.list_buckets().get("Buckets", [])]
-    if CAREER_BUCKET not in existing_buckets:
-        s3.create_bucket(Bucket=CAREER_BUCKET)
+    if await storage.ensure_bucket():
         print(f" Career S3 bucket '{CAREER_BUCKET}' created.")
     else:
         print(f" Career S3 bucket '{CAREER_BUCKET}' already exists.")
 
-def upload_fileobj(file_obj, filename: str = None, bucket_name: str = CAREER_BUCKET) -> str:
+async def upload_fileobj(file_obj, filename: str = None) -> str:
     """
-    Upload file-like object to Career S3 bucket.
+    Upload file-like object to Career S3 bucket without blocking the event loop.
     Returns the key used so you can generate presigned URLs later.
     """
-    # create unique key to avoid overwrite
-    ext = ""
-    if filename and "." in filename:
-        ext = "." + filename.rsplit(".", 1)[1]
-    key = f"{uuid4().hex}{ext}"
+    return await content_store.put(storage, file_obj, filename)
 
-    try:
-        s3.head_bucket(Bucket=bucket_name)
-    except Exception:
-        s3.create_bucket(Bucket=bucket_name)
+def generate_presigned_url(key: str, expires_in: int = 3600) -> str:
+    """Generate presigned GET url for Career bucket (cached until shortly before expiry)"""
+    return generate_presigned_urls([key], expires_in)[key]
 
-    s3.upload_fileobj(file_obj, bucket_name, key)
-    return key
-
-def generate_presigned_url(key: str, expires_in: int = 3600, bucket_name: str = CAREER_BUCKET) -> str:
-    """Generate presigned GET url for Career bucket"""
-    return s3.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": bucket_name, "Key": key},
-        ExpiresIn=expires_in,
-    )
+def generate_presigned_urls(keys, expires_in: int = 3600) -> dict:
+    """Batch version of generate_presigned_url; returns {key: url}, skipping empty keys"""
+    return storage.presigned_urls(keys, expires_in)
@@ -0,0 +1,10 @@
+# bench/bench_helpers.py
+"""Helpers shared by the bench scripts (run from bench/, which is on sys.path)."""
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
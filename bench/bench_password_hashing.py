@@ -0,0 +1,99 @@
+# bench/bench_password_hashing.py
+"""
+Login-path benchmark: bcrypt verification inline on the event loop vs. offloaded
+to the hashing pool, under concurrent load.
+
+    python bench/bench_password_hashing.py --logins 200 --concurrency 32
+
+Prints JSON with login latency percentiles, throughput and event-loop lag
+(how long an unrelated request would have been stalled).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import hashing  # noqa: E402
+from bench_helpers import percentile  # noqa: E402
+
+def summarize(latencies, elapsed, lags, rejected):
+    ms = [x * 1000 for x in latencies]
+    lag_ms = [x * 1000 for x in lags]
+    return {
+        "logins": len(latencies),
+        "rejected": rejected,
+        "throughput_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50), 1),
+        "p95_ms": round(percentile(ms, 95), 1),
+        "p99_ms": round(percentile(ms, 99), 1),
+        "loop_lag_p99_ms": round(percentile(lag_ms, 99) or 0, 1),
+        "loop_lag_max_ms": round(max(lag_ms, default=0), 1),
+    }
+
+async def probe_loop_lag(lags, stop, interval=0.01):
+    # Stand-in for every other request sharing the worker
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - start - interval))
+
+async def run(mode, stored_hash, logins, concurrency):
+    latencies, lags = [], []
+    rejected = 0
+    gate = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+
+    async def login():
+        nonlocal rejected
+        async with gate:
+            start = time.perf_counter()
+            try:
+                if mode == "inline":
+                    await asyncio.sleep(0)
+                    hashing.verify_and_update_sync("correct horse", stored_hash)
+                else:
+                    await hashing.verify_and_update_password("correct horse", stored_hash)
+            except Exception:
+                rejected += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    prober = asyncio.create_task(probe_loop_lag(lags, stop))
+    # Warm the pool up so process start-up is not counted
+    if mode == "pool":
+        await hashing.verify_and_update_password("correct horse", stored_hash)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+    return summarize(latencies, elapsed, lags, rejected)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--modes", default="inline,pool")
+    args = parser.parse_args()
+
+    stored_hash = hashing.hash_password_sync("correct horse")
+    report = {
+        "bcrypt_rounds": hashing.BCRYPT_ROUNDS,
+        "executor": hashing.PASSWORD_HASH_EXECUTOR,
+        "workers": hashing.PASSWORD_HASH_WORKERS,
+        "max_inflight": hashing.PASSWORD_HASH_MAX_INFLIGHT,
+        "concurrency": args.concurrency,
+        "results": {},
+    }
+    for mode in args.modes.split(","):
+        report["results"][mode] = asyncio.run(run(mode, stored_hash, args.logins, args.concurrency))
+        hashing.shutdown_hash_pool()
+        hashing._slots = None
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench/bench_serialization.py
+"""
+Micro-benchmark for list serialization: ORM instances + response_model
+validation (the default list path) vs. Core rows -> dicts -> JSON bytes
+(the ?fast=true path), against an in-memory SQLite table.
+
+    python bench/bench_serialization.py --rows 1000,10000 --repeat 5
+
+Prints JSON with the best-of-N time per path and the speed-up.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from serialization import dumps  # noqa: E402
+
+def seed(engine, rows):
+    models.Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Blog),
+            [{"title": f"Post {i}", "content": "lorem ipsum " * 150, "image_url": f"{i:032x}.png", "upload_status": "stored"} for i in range(rows)],
+        )
+
+def sign(key):
+    # Stand-in for the (cached) presigner so both paths do the same URL work
+    return f"https://bucket.example/{key}?sig=abc"
+
+def orm_path(engine):
+    page = TypeAdapter(schemas.BlogPage)
+    with Session(engine) as db:
+        blogs = db.execute(select(models.Blog).order_by(models.Blog.id.desc())).scalars().all()
+        for b in blogs:
+            b.image_url = sign(b.image_url)
+        validated = page.validate_python({"items": blogs, "next_cursor": None, "estimated_total": None})
+        return page.dump_json(validated)
+
+def fast_path(engine):
+    with engine.connect() as conn:
+        rows = conn.execute(select(*models.Blog.__table__.c).order_by(models.Blog.id.desc())).all()
+        items = [
+            {"title": r.title, "content": r.content, "image_url": sign(r.image_url), "id": r.id, "upload_status": r.upload_status}
+            for r in rows
+        ]
+        return dumps({"items": items, "next_cursor": None, "estimated_total": None})
+
+def best_of(fn, engine, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(engine)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = {}
+    for rows in (int(n) for n in args.rows.split(",")):
+        engine = create_engine("sqlite://")
+        seed(engine, rows)
+        assert json.loads(orm_path(engine)) == json.loads(fast_path(engine))
+        orm = best_of(orm_path, engine, args.repeat)
+        fast = best_of(fast_path, engine, args.repeat)
+        report[rows] = {"orm_ms": round(orm * 1000, 1), "fast_ms": round(fast * 1000, 1), "speedup": round(orm / fast, 2)}
+        engine.dispose()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# bench/check_query_counts.py
+"""
+Pins the number of SQL statements each crud.py write costs (COMMIT is not a
+statement here). Exits non-zero if any count drifts from EXPECTED.
+
+    DATABASE_URL=postgresql+asyncpg://... python bench/check_query_counts.py
+
+Runs against a scratch database: it creates the schema and writes rows.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Object keys below are made up; keep their deletion away from real buckets
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", os.path.join(tempfile.gettempdir(), "check_query_counts"))
+
+from sqlalchemy import event  # noqa: E402
+
+import content_store  # noqa: E402
+import crud  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+# Blog writes also pg_notify() the blog cache on Postgres (same transaction)
+NOTIFY = 1 if engine.dialect.name == "postgresql" else 0
+
+EXPECTED = {
+    "create_user": 1,
+    "update_user": 1,
+    "create_blog": 1 + NOTIFY,
+    "update_blog": 1 + NOTIFY,
+    "delete_blog": 1 + NOTIFY,
+    "create_blog_with_image": 2 + NOTIFY,    # + image refcount
+    "update_blog_new_image": 4 + NOTIFY,     # + lock old key, refcount new, refcount old
+    "create_career": 1,
+    "create_career_with_skills": 5,   # + upsert tags, read tag ids, link, bump counts
+    "update_career": 1,
+    "delete_career": 3,               # + lock the owned row, unlink tags (RETURNING skill ids)
+    "deactivate_user": 2,             # + queue the deletion job
+    "delete_user_blogs_batch": 2 + NOTIFY,  # + image refcounts
+    "delete_user_careers_batch": 4,   # select ids, unlink tags, bump counts, delete
+    "delete_user": 4,                 # lock user, delete leftover blogs, find leftover careers, delete user
+}
+
+statements = []
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE", "ROLLBACK")):
+        statements.append(statement)
+
+@asynccontextmanager
+async def counting(name, results):
+    statements.clear()
+    yield
+    results[name] = len(statements)
+
+async def main() -> int:
+    await migrate()
+    results = {}
+    async with SessionLocal() as db:
+        async with counting("create_user", results):
+            user = await crud.create_user(db, schemas.UserCreate(username=f"qc_{os.getpid()}", email=f"qc_{os.getpid()}@example.com", password="x"))
+        async with counting("update_user", results):
+            await crud.update_user(db, user.id, schemas.UserUpdate(email=f"qc2_{os.getpid()}@example.com"))
+
+        async with counting("create_blog", results):
+            blog = await crud.create_blog(db, schemas.BlogCreate(title="t", content="c", user_id=user.id))
+        async with counting("update_blog", results):
+            await crud.update_blog(db, blog.id, schemas.BlogCreate(title="t2", content="c2"), owner_id=user.id)
+        async with counting("delete_blog", results):
+            await crud.delete_blog(db, blog.id, owner_id=user.id)
+
+        async with counting("create_blog_with_image", results):
+            blog = await crud.create_blog(db, schemas.BlogCreate(title="t", content="c", image_url="qc-a.png", user_id=user.id))
+        async with counting("update_blog_new_image", results):
+            await crud.update_blog(db, blog.id, schemas.BlogCreate(title="t", content="c", image_url="qc-b.png"), owner_id=user.id)
+        await content_store.drain()  # the replaced image is deleted in the background
+
+        career_in = dict(name="n", email="n@example.com", position="dev", type="cv_bank", user_id=user.id)
+        async with counting("create_career", results):
+            career = await crud.create_career(db, schemas.CareerCreate(**career_in))
+        async with counting("create_career_with_skills", results):
+            await crud.create_career(db, schemas.CareerCreate(**career_in, skills="qc-python, qc-sql"))
+        async with counting("update_career", results):
+            await crud.update_career(db, career.id, schemas.CareerUpdate(name="n2", email="n@example.com", position="dev"), owner_id=user.id)
+        async with counting("delete_career", results):
+            await crud.delete_career(db, career.id, owner_id=user.id)
+
+        await crud.create_blog(db, schemas.BlogCreate(title="t", content="c", user_id=user.id))
+        async with counting("deactivate_user", results):
+            await crud.deactivate_user(db, user.id)
+        async with counting("delete_user_blogs_batch", results):
+            await crud.delete_user_blogs_batch(db, user.id, 1000)
+        async with counting("delete_user_careers_batch", results):
+            await crud.delete_user_careers_batch(db, user.id, 1000)
+        async with counting("delete_user", results):
+            await crud.delete_user(db, user.id)
+
+    failed = False
+    for name, expected in EXPECTED.items():
+        actual = results.get(name)
+        status = "ok" if actual == expected else "FAIL"
+        failed |= status == "FAIL"
+        print(f"{status:4} {name:28} expected={expected} actual={actual}")
+    await engine.dispose()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
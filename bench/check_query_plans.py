@@ -0,0 +1,163 @@
+# bench/check_query_plans.py
+"""
+Fails if a hot crud.py query plans a sequential scan over one of the big
+tables on a seeded dataset. The statements are captured while the real crud
+functions run, then re-issued under EXPLAIN (FORMAT JSON) with the same
+parameters, so the check follows crud.py as it changes.
+
+    DATABASE_URL=postgresql+asyncpg://... python bench/check_query_plans.py --rows 20000
+
+Postgres only (SQLite's planner says little about production plans). Runs
+against a scratch database: it migrates, seeds rows and deletes a user.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("PASSWORD_HASH_EXECUTOR", "thread")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy import event, insert, text  # noqa: E402
+
+import crud  # noqa: E402
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import migrate  # noqa: E402
+from pagination import PageParams  # noqa: E402
+
+# Seq scans on these fail the check; small lookup tables (skills, users) may legitimately scan
+BIG_TABLES = {"blogs", "careers", "career_skills"}
+# Enough distinct values that each filter below selects ~1-2% of rows, as in production
+SKILLS = [f"skill{i}" for i in range(100)]
+POSITIONS = [f"role{i}" for i in range(50)]
+
+captured = []
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _capture(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")) and not executemany:
+        captured.append((statement, parameters))
+
+@asynccontextmanager
+async def capturing(name, queries):
+    captured.clear()
+    yield
+    queries[name] = list(captured)
+
+def page(limit=50, cursor=None, include_total=False):
+    return PageParams(cursor=cursor, limit=limit, include_total=include_total)
+
+async def seed(rows: int) -> dict:
+    await migrate()
+    async with SessionLocal() as db:
+        result = await db.execute(
+            insert(models.User).returning(models.User.id),
+            [{"username": f"plan_{os.getpid()}_{i}", "email": f"plan_{os.getpid()}_{i}@example.com", "hashed_password": "x"} for i in range(200)],
+        )
+        user_ids = list(result.scalars())
+        for start in range(0, rows, 5000):
+            n = min(rows, start + 5000) - start
+            await db.execute(insert(models.Blog), [
+                {"title": f"post {start + i}", "content": "lorem ipsum " * 50, "user_id": user_ids[(start + i) % len(user_ids)]}
+                for i in range(n)
+            ])
+            await crud.bulk_create_careers(db, [
+                {"name": "n", "email": "n@example.com", "position": POSITIONS[(start + i) % 50], "resume_url": None,
+                 "skills": f"{SKILLS[(start + i) % 100]}, {SKILLS[(start + i) * 7 % 100]}", "type": "cv_bank" if i % 3 else "internal",
+                 "user_id": user_ids[(start + i) % len(user_ids)]}
+                for i in range(n)
+            ])
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    return {"user_ids": user_ids}
+
+async def capture_hot_queries(ctx) -> dict:
+    queries = {}
+    user_id = ctx["user_ids"][0]
+    async with SessionLocal() as db:
+        blogs, cursor, _ = await crud.get_blogs(db, page())
+        async with capturing("get_blogs", queries):
+            await crud.get_blogs(db, page(cursor=cursor))
+        async with capturing("get_blog_summaries", queries):
+            await crud.get_blog_summaries(db, page(cursor=cursor))
+        async with capturing("get_blog", queries):
+            await crud.get_blog(db, blogs[0].id)
+        async with capturing("get_blog_version", queries):
+            await crud.get_blog_version(db, blogs[0].id)
+        async with capturing("get_user_blogs", queries):
+            await crud.get_user_blogs(db, user_id, page())
+
+        careers, cursor, _ = await crud.get_careers(db, page(), type="cv_bank")
+        async with capturing("get_careers_cv_bank", queries):
+            await crud.get_careers(db, page(cursor=cursor), type="cv_bank")
+        async with capturing("get_career_by_id", queries):
+            await crud.get_career_by_id(db, careers[0].id)
+        async with capturing("get_user_careers", queries):
+            await crud.get_user_careers(db, user_id, page())
+        async with capturing("get_careers_by_skills", queries):
+            await crud.get_careers_by_skills(db, page(), ["skill1", "skill7"], match="any")
+        # ?include_total=true: the estimate EXPLAINs the filtered query, IN lists included
+        for match in ("any", "all"):
+            async with capturing(f"get_careers_by_skills_total_{match}", queries):
+                _, _, total = await crud.get_careers_by_skills(db, page(include_total=True), ["skill1", "skill7"], match=match)
+            if total is None:
+                raise AssertionError(f"get_careers_by_skills(match={match!r}, include_total=True) returned no estimate")
+        async with capturing("search_careers", queries):
+            await crud.search_careers(db, page(), q="role7", skills=[], match="all", position=None, type="cv_bank")
+
+    # Writes whose WHERE must hit an index (ownership / FK detach); this user is expendable
+    async with SessionLocal() as db:
+        async with capturing("delete_user_blogs_batch", queries):
+            await crud.delete_user_blogs_batch(db, ctx["user_ids"][-1], 1000)
+        async with capturing("delete_user_careers_batch", queries):
+            await crud.delete_user_careers_batch(db, ctx["user_ids"][-1], 1000)
+        async with capturing("delete_user", queries):
+            await crud.delete_user(db, ctx["user_ids"][-1])
+    return queries
+
+def seq_scans(plan: dict) -> list[str]:
+    """Relations read by a Seq Scan anywhere in a FORMAT JSON plan tree."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+async def explain(statement, parameters) -> dict:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        raw = result.scalar()
+    plan = json.loads(raw) if isinstance(raw, str) else raw
+    return plan[0]["Plan"]
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000, help="blogs and careers to seed")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("check_query_plans.py needs a Postgres DATABASE_URL")
+        return 2
+
+    ctx = await seed(args.rows)
+    queries = await capture_hot_queries(ctx)
+
+    failed = False
+    for name, statements in queries.items():
+        for statement, parameters in statements:
+            scanned = sorted(set(seq_scans(await explain(statement, parameters))) & BIG_TABLES)
+            status = "FAIL" if scanned else "ok"
+            failed |= bool(scanned)
+            first_line = " ".join(statement.split())[:90]
+            print(f"{status:4} {name:24} {first_line}" + (f"  <- seq scan on {', '.join(scanned)}" if scanned else ""))
+    await engine.dispose()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
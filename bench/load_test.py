@@ -0,0 +1,266 @@
+# bench/load_test.py
+"""
+End-to-end load test: boots the app in-process, seeds users/blogs/careers and
+drives a weighted mix of login, list, search, read and upload requests.
+
+    python bench/load_test.py --users 50 --blogs 5000 --careers 5000 \
+        --requests 5000 --concurrency 32 --out baseline.json
+
+Defaults to a throwaway SQLite file and STORAGE_BACKEND=local, so it needs no
+Postgres or S3; set DATABASE_URL to point it at a scratch Postgres instead
+(it writes rows). Prints JSON with throughput and p50/p95/p99 per endpoint;
+diff two runs' output to compare commits.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+WORKDIR = os.path.join(tempfile.gettempdir(), "blogs-careers-bench")
+os.makedirs(WORKDIR, exist_ok=True)
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{WORKDIR}/bench.db")
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", os.path.join(WORKDIR, "storage"))
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+import crud  # noqa: E402
+import hashing  # noqa: E402
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from migrations import migrate  # noqa: E402
+from bench_helpers import percentile  # noqa: E402
+
+PASSWORD = "bench-password"
+SKILLS = ["python", "go", "rust", "sql", "kubernetes", "react", "aws", "terraform", "java", "docker"]
+POSITIONS = ["backend engineer", "frontend engineer", "data engineer", "sre", "product designer"]
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+# name -> weight; override with --mix "list_blogs=10,login=0"
+DEFAULT_MIX = {
+    "login": 2,
+    "me": 5,
+    "list_blogs": 15,
+    "list_blogs_summary": 10,
+    "get_blog": 10,
+    "list_cv_bank": 10,
+    "search_careers": 10,
+    "careers_by_skill": 8,
+    "skill_facets": 5,
+    "get_career": 8,
+    "create_blog": 4,
+    "create_cv": 3,
+}
+
+# ----------------------
+# Seeding
+# ----------------------
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+async def seed(users: int, blogs: int, careers: int, rng: random.Random) -> dict:
+    if engine.dialect.name == "sqlite":
+        db_path = engine.url.database
+        await engine.dispose()
+        if db_path and os.path.exists(db_path):
+            os.remove(db_path)
+    await migrate()
+
+    # Every bench user shares one hash, so seeding doesn't pay bcrypt per user
+    hashed = hashing.hash_password_sync(PASSWORD)
+    tag = f"{int(time.time())}"
+    async with SessionLocal() as db:
+        result = await db.execute(
+            insert(models.User).returning(models.User.id),
+            [{"username": f"bench_{tag}_{i}", "email": f"bench_{tag}_{i}@example.com",
+              "hashed_password": hashed, "is_active": True} for i in range(users)],
+        )
+        user_ids = list(result.scalars())
+        usernames = [f"bench_{tag}_{i}" for i in range(users)]
+
+        for start in range(0, blogs, 1000):
+            await db.execute(insert(models.Blog), [
+                {"title": _text(rng, 6), "content": _text(rng, 300), "user_id": rng.choice(user_ids)}
+                for _ in range(start, min(blogs, start + 1000))
+            ])
+        for start in range(0, careers, 1000):
+            rows = [
+                {"name": _text(rng, 2), "email": "bench@example.com", "position": rng.choice(POSITIONS),
+                 "skills": ", ".join(rng.sample(SKILLS, 3)), "type": rng.choice(["cv_bank", "internal"]),
+                 "resume_url": None, "user_id": rng.choice(user_ids)}
+                for _ in range(start, min(careers, start + 1000))
+            ]
+            await crud.bulk_create_careers(db, rows)
+        await db.commit()
+    return {"usernames": usernames}
+
+# ----------------------
+# Scenarios: each returns the response of one request
+# ----------------------
+async def s_login(c, ctx, rng):
+    return await c.post("/auth/login", data={"username": rng.choice(ctx["usernames"]), "password": PASSWORD})
+
+async def s_me(c, ctx, rng):
+    return await c.get("/users/me", headers=rng.choice(ctx["headers"]))
+
+async def s_list_blogs(c, ctx, rng):
+    return await c.get("/blogs/", params={"limit": 20}, headers=rng.choice(ctx["headers"]))
+
+async def s_list_blogs_summary(c, ctx, rng):
+    return await c.get("/blogs/", params={"limit": 20, "view": "summary"}, headers=rng.choice(ctx["headers"]))
+
+async def s_get_blog(c, ctx, rng):
+    return await c.get(f"/blogs/{rng.randint(1, ctx['blogs'])}", headers=rng.choice(ctx["headers"]))
+
+async def s_list_cv_bank(c, ctx, rng):
+    return await c.get("/careers/cv_bank", params={"limit": 20}, headers=rng.choice(ctx["headers"]))
+
+async def s_search_careers(c, ctx, rng):
+    params = {"q": rng.choice(POSITIONS).split()[0], "limit": 20}
+    return await c.get("/careers/cv_bank/search", params=params, headers=rng.choice(ctx["headers"]))
+
+async def s_careers_by_skill(c, ctx, rng):
+    params = {"tags": ",".join(rng.sample(SKILLS, 2)), "limit": 20}
+    return await c.get("/careers/skills", params=params, headers=rng.choice(ctx["headers"]))
+
+async def s_skill_facets(c, ctx, rng):
+    return await c.get("/careers/skills/facets", headers=rng.choice(ctx["headers"]))
+
+async def s_get_career(c, ctx, rng):
+    return await c.get(f"/careers/{rng.randint(1, ctx['careers'])}", headers=rng.choice(ctx["headers"]))
+
+async def s_create_blog(c, ctx, rng):
+    files = {"image": ("bench.png", io.BytesIO(rng.randbytes(ctx["upload_bytes"])), "image/png")}
+    data = {"title": _text(rng, 6), "content": _text(rng, 300)}
+    return await c.post("/blogs/", data=data, files=files, headers=rng.choice(ctx["headers"]))
+
+async def s_create_cv(c, ctx, rng):
+    files = {"resume": ("cv.pdf", io.BytesIO(rng.randbytes(ctx["upload_bytes"])), "application/pdf")}
+    data = {"name": _text(rng, 2), "email": "bench@example.com", "position": rng.choice(POSITIONS),
+            "skills": ", ".join(rng.sample(SKILLS, 3))}
+    return await c.post("/careers/cv_bank", data=data, files=files, headers=rng.choice(ctx["headers"]))
+
+SCENARIOS = {name: globals()[f"s_{name}"] for name in DEFAULT_MIX}
+
+# ----------------------
+# Driver
+# ----------------------
+def summarize(latencies, errors, elapsed):
+    ms = [x * 1000 for x in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(ms, 50) or 0, 2),
+        "p95_ms": round(percentile(ms, 95) or 0, 2),
+        "p99_ms": round(percentile(ms, 99) or 0, 2),
+    }
+
+def parse_mix(spec: str) -> dict:
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"unknown scenario '{name}' (known: {', '.join(SCENARIOS)})")
+        mix[name] = float(weight)
+    return {name: w for name, w in mix.items() if w > 0}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+async def run(args) -> dict:
+    import main  # after the env defaults above
+
+    rng = random.Random(args.seed)
+    ctx = await seed(args.users, args.blogs, args.careers, rng)
+    ctx.update(blogs=args.blogs, careers=args.careers, upload_bytes=args.upload_kb * 1024)
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+
+    for handler in main.app.router.on_startup:
+        await handler()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        # Tokens are fetched up front so only the "login" scenario pays bcrypt
+        ctx["headers"] = []
+        for username in ctx["usernames"][:args.sessions]:
+            r = await client.post("/auth/login", data={"username": username, "password": PASSWORD})
+            r.raise_for_status()
+            ctx["headers"].append({"Authorization": f"Bearer {r.json()['access_token']}"})
+
+        plan = rng.choices(names, weights=weights, k=args.requests)
+        latencies = {name: [] for name in names}
+        errors = {name: 0 for name in names}
+        next_index = iter(range(args.requests))
+
+        async def worker(worker_id):
+            wrng = random.Random(f"{args.seed}-{worker_id}")
+            for i in next_index:
+                name = plan[i]
+                start = time.perf_counter()
+                try:
+                    response = await SCENARIOS[name](client, ctx, wrng)
+                    failed = response.status_code >= 400
+                except Exception:
+                    failed = True
+                latencies[name].append(time.perf_counter() - start)
+                errors[name] += failed
+
+        # Short warm-up so caches / pools / lazy clients are not counted
+        for name in names:
+            await SCENARIOS[name](client, ctx, rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    for handler in main.app.router.on_shutdown:
+        await handler()
+    await engine.dispose()
+
+    return {
+        "commit": git_commit(),
+        "database": engine.dialect.name,
+        "storage": os.environ["STORAGE_BACKEND"],
+        "config": {k: getattr(args, k) for k in ("users", "blogs", "careers", "requests", "concurrency", "sessions", "upload_kb", "seed")},
+        "mix": mix,
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize([x for v in latencies.values() for x in v], sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--blogs", type=int, default=5000)
+    parser.add_argument("--careers", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=20, help="logged-in users the traffic is spread over")
+    parser.add_argument("--upload-kb", type=int, default=64)
+    parser.add_argument("--mix", default="", help='weights to override, e.g. "create_blog=0,login=5"')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="also write the JSON report here")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    hashing.shutdown_hash_pool()
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+
+if __name__ == "__main__":
+    main()
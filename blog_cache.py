@@ -0,0 +1,133 @@
+# blog_cache.py
+"""
+Per-worker cache of blog list pages and single posts.
+
+Entries hold raw rows (image *keys*, not URLs); routers sign on the way out.
+Every blog write bumps a generation counter: list pages are keyed by
+generation, so one bump retires all of them, while only the written post is
+dropped. On Postgres, writes also pg_notify() the blog id inside their
+transaction and every worker LISTENs, so all processes invalidate on commit.
+While that listener is down the cache is bypassed, since other workers'
+writes would go unnoticed.
+
+Entries are only ever filled from the primary (fill_session): a lagging
+replica row stored under a fresh generation would be served to everyone,
+the writer included, until it expires.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from cache_utils import TTLCache
+from database import DATABASE_URL, SessionLocal, is_primary
+
+BLOG_CACHE_TTL = float(os.getenv("BLOG_CACHE_TTL", "30"))      # seconds; 0 disables
+BLOG_CACHE_SIZE = int(os.getenv("BLOG_CACHE_SIZE", "2000"))    # entries each for pages and posts
+BLOG_CACHE_CHANNEL = os.getenv("BLOG_CACHE_CHANNEL", "blog_changes")
+BLOG_CACHE_LISTEN_RETRY = float(os.getenv("BLOG_CACHE_LISTEN_RETRY", "5"))
+
+IS_POSTGRES = make_url(DATABASE_URL).get_backend_name() == "postgresql"
+
+pages = TTLCache(maxsize=BLOG_CACHE_SIZE)
+posts = TTLCache(maxsize=BLOG_CACHE_SIZE)
+_generation = 0
+_listening = False
+_listener_task: asyncio.Task | None = None
+
+def _enabled() -> bool:
+    return BLOG_CACHE_TTL > 0 and (_listening or not IS_POSTGRES)
+
+def generation() -> int:
+    """Capture before reading from the DB; pass to put_* so a concurrent write isn't overwritten."""
+    return _generation
+
+@asynccontextmanager
+async def fill_session(db):
+    """Session to read cache misses from: `db` unless it's a replica and the result will be cached."""
+    if _enabled() and not is_primary(db):
+        async with SessionLocal() as primary:
+            yield primary
+    else:
+        yield db
+
+def get_page(key):
+    return pages.get((_generation, key)) if _enabled() else None
+
+def put_page(gen: int, key, value):
+    if _enabled() and gen == _generation:
+        pages.set((gen, key), value, BLOG_CACHE_TTL)
+
+def get_post(blog_id: int):
+    return posts.get(blog_id) if _enabled() else None
+
+def put_post(gen: int, blog_id: int, value: dict):
+    if _enabled() and gen == _generation:
+        posts.set(blog_id, value, BLOG_CACHE_TTL)
+
+def invalidate(blog_id: int | None = None):
+    """Drop one post (or every post if None) and all list pages in this worker."""
+    global _generation
+    _generation += 1
+    if blog_id is None:
+        posts.clear()
+    else:
+        posts.pop(blog_id)
+
+async def notify(db, blog_id: int | None):
+    """Queue a cross-worker invalidation (None = every post); Postgres delivers it only if the transaction commits."""
+    if IS_POSTGRES:
+        payload = "*" if blog_id is None else str(blog_id)
+        await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": BLOG_CACHE_CHANNEL, "payload": payload})
+
+# ----------------------
+# LISTEN loop (one dedicated asyncpg connection per worker, outside the pool)
+# ----------------------
+def _on_notify(connection, pid, channel, payload):
+    try:
+        invalidate(int(payload))
+    except ValueError:
+        invalidate()  # "*": many posts changed at once
+
+async def _listen_forever():
+    global _listening
+    import asyncpg
+
+    dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(dsn)
+            closed = asyncio.Event()
+            conn.add_termination_listener(lambda _: closed.set())
+            await conn.add_listener(BLOG_CACHE_CHANNEL, _on_notify)
+            invalidate()  # anything cached before (re)connecting may have missed a notification
+            _listening = True
+            await closed.wait()
+            print("Blog cache listener disconnected, bypassing cache until it reconnects")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Blog cache listener failed ({e}), retrying in {BLOG_CACHE_LISTEN_RETRY}s")
+        finally:
+            _listening = False
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        await asyncio.sleep(BLOG_CACHE_LISTEN_RETRY)
+
+def start_listener():
+    global _listener_task
+    if IS_POSTGRES and BLOG_CACHE_TTL > 0 and _listener_task is None:
+        _listener_task = asyncio.create_task(_listen_forever())
+
+async def stop_listener():
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
@@ -0,0 +1,152 @@
+# bulk_import.py
+import asyncio
+import csv
+import io
+import itertools
+import json
+import os
+import zipfile
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import crud, schemas
+from aws_utils import upload_fileobj as career_upload
+from storage import run_blocking
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_UPLOAD_CONCURRENCY = int(os.getenv("BULK_UPLOAD_CONCURRENCY", "16"))
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", "100000"))
+
+def iter_manifest(file_obj, fmt: str):
+    """
+    Yield rows from an NDJSON or CSV manifest (file opened in binary mode).
+    An unparsable NDJSON line is yielded as the ValueError itself so the caller
+    can report it and carry on.
+    """
+    text = io.TextIOWrapper(file_obj, encoding="utf-8", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+def _read_rows(rows, n: int):
+    """
+    Up to n more manifest rows (blocking reads; run off the event loop).
+    Returns (rows, error): an undecodable manifest ends with the error.
+    """
+    batch = []
+    try:
+        batch.extend(itertools.islice(rows, n))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return batch, e
+    return batch, None
+
+def _open_archive(archive_file) -> zipfile.ZipFile:
+    try:
+        return zipfile.ZipFile(archive_file)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"resumes is not a readable zip archive: {e}")
+
+async def _upload_resume(archive: zipfile.ZipFile | None, name: str, slots: asyncio.Semaphore) -> str:
+    if archive is None:
+        raise ValueError(f"resume '{name}' given but no resumes archive uploaded")
+    try:
+        member = archive.getinfo(name)
+    except KeyError:
+        raise ValueError(f"resume '{name}' not found in archive")
+    async with slots:
+        # ZipFile serializes reads of the shared handle, so members can upload in parallel
+        with archive.open(member) as resume:
+            return await career_upload(resume, name)
+
+async def _import_chunk(db, chunk, archive, slots, career_type, user_id, report):
+    """chunk: [(row_number, raw dict)]. Validates, uploads resumes concurrently, inserts in one go."""
+    valid = []
+    for row_number, raw in chunk:
+        try:
+            if not isinstance(raw, dict):
+                raise ValueError("row must be an object")
+            career = schemas.CareerCreate(
+                name=raw.get("name"),
+                email=raw.get("email"),
+                position=raw.get("position"),
+                skills=raw.get("skills") or None,
+                type=career_type,
+            )
+            valid.append((row_number, career, raw.get("resume") or None))
+        except (ValidationError, ValueError) as e:
+            report.errors.append(schemas.BulkImportError(row=row_number, error=str(e)))
+
+    async def upload(resume_name):
+        return await _upload_resume(archive, resume_name, slots) if resume_name else None
+
+    keys = await asyncio.gather(*(upload(name) for _, _, name in valid), return_exceptions=True)
+
+    rows, row_numbers = [], []
+    for (row_number, career, _), key in zip(valid, keys):
+        if isinstance(key, Exception):
+            report.errors.append(schemas.BulkImportError(row=row_number, error=f"resume upload failed: {key}"))
+            continue
+        rows.append({**career.model_dump(exclude={"resume_url"}), "resume_url": key,
+                     "upload_status": "stored" if key else None, "user_id": user_id})
+        row_numbers.append(row_number)
+    if not rows:
+        return
+
+    ids, errors = await crud.bulk_create_careers(db, rows)
+    for index, career_id in enumerate(ids):
+        if career_id is None:
+            report.errors.append(schemas.BulkImportError(row=row_numbers[index], error=errors[index]))
+        else:
+            report.ids.append(career_id)
+
+async def import_careers(db: AsyncSession, manifest, fmt: str, archive_file, career_type: str, user_id: int) -> schemas.BulkImportResult:
+    """
+    Import careers from a manifest (+ optional zip of resumes) in chunks of BULK_CHUNK_SIZE.
+    Each chunk is committed on its own; failing rows are reported, not fatal.
+    An unreadable archive, or a manifest that can't be decoded before any row
+    is committed, is a 400; a manifest that breaks later ends the import with
+    a report entry.
+    """
+    report = schemas.BulkImportResult()
+    archive = await run_blocking(_open_archive, archive_file) if archive_file is not None else None
+    slots = asyncio.Semaphore(BULK_UPLOAD_CONCURRENCY)
+    try:
+        rows = iter_manifest(manifest, fmt)
+        row_number = 0
+        done = False
+        while not done:
+            batch, error = await run_blocking(_read_rows, rows, BULK_CHUNK_SIZE)
+            if error is not None and not report.ids:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unreadable manifest: {error}")
+            done = error is not None or len(batch) < BULK_CHUNK_SIZE
+            chunk = []
+            for raw in batch:
+                row_number += 1
+                if isinstance(raw, ValueError):
+                    report.errors.append(schemas.BulkImportError(row=row_number, error=f"invalid manifest row: {raw}"))
+                    continue
+                if row_number > BULK_MAX_ROWS:
+                    report.errors.append(schemas.BulkImportError(row=row_number, error=f"manifest exceeds {BULK_MAX_ROWS} rows"))
+                    done = True
+                    break
+                chunk.append((row_number, raw))
+            if chunk:
+                await _import_chunk(db, chunk, archive, slots, career_type, user_id, report)
+            if error is not None:
+                report.errors.append(schemas.BulkImportError(row=row_number + 1, error=f"unreadable manifest, import stopped: {error}"))
+    finally:
+        if archive is not None:
+            archive.close()
+
+    report.inserted = len(report.ids)
+    report.failed = len(report.errors)
+    return report
@@ -0,0 +1,85 @@
+# cache_utils.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Bounded LRU cache where every entry carries its own expiry (monotonic seconds).
+    Thread-safe, so it can be shared between the event loop and worker threads.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+        return default if entry is _MISSING else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+# ----------------------
+# Presigned URL cache (shared by the blogs and careers buckets)
+# ----------------------
+PRESIGN_CACHE_SIZE = int(os.getenv("PRESIGN_CACHE_SIZE", "50000"))
+# A cached URL is handed out until this many seconds before it expires,
+# so clients always get at least this much validity.
+PRESIGN_CACHE_MARGIN = int(os.getenv("PRESIGN_CACHE_MARGIN", "600"))
+
+presigned_url_cache = TTLCache(maxsize=PRESIGN_CACHE_SIZE)
+
+def cached_presign(bucket: str, keys, expires_in: int, sign) -> dict:
+    """
+    Return {key: url} for `keys`, signing only the ones not already cached.
+    `sign(key)` must produce a presigned URL valid for `expires_in` seconds.
+    """
+    urls = {}
+    ttl = expires_in - PRESIGN_CACHE_MARGIN
+    for key in keys:
+        if key in urls:
+            continue
+        cache_key = (bucket, key, expires_in)
+        url = presigned_url_cache.get(cache_key)
+        if url is None:
+            url = sign(key)
+            presigned_url_cache.set(cache_key, url, ttl)
+        urls[key] = url
+    return urls
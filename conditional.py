@@ -0,0 +1,113 @@
+# conditional.py
+"""
+HTTP validators for blogs and careers: strong ETags, Last-Modified,
+If-None-Match / If-Modified-Since (304) and If-Match (412).
+
+Single resources get `"<kind>-<id>-v<version>"`. Responses that embed presigned
+URLs also carry the current presign epoch (`-e<n>`), an interval no longer than
+PRESIGN_CACHE_MARGIN: a cached URL always has at least that much validity left
+when served, so a client that gets a 304 still holds a working URL.
+If-Match only compares kind/id/version, so the epoch never causes a 412.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response, status
+
+from cache_utils import PRESIGN_CACHE_MARGIN
+
+def presign_epoch() -> int:
+    return int(time.time() // max(1, PRESIGN_CACHE_MARGIN))
+
+def resource_etag(kind: str, resource_id: int, version: int, signed: bool) -> str:
+    tag = f"{kind}-{resource_id}-v{version}"
+    if signed:
+        tag += f"-e{presign_epoch()}"
+    return f'"{tag}"'
+
+def list_etag(kind: str, items, next_cursor: str | None, signed: bool) -> str:
+    """ETag of a list page from (id, version) pairs -- changes on any insert/update/delete within it."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{kind}|{next_cursor}".encode())
+    for item_id, version in items:
+        digest.update(f"|{item_id}.{version}".encode())
+    if signed:
+        digest.update(f"|e{presign_epoch()}".encode())
+    return f'"{kind}-list-{digest.hexdigest()}"'
+
+def last_modified(updated_at: datetime, signed: bool) -> datetime:
+    """updated_at (UTC), moved up to the start of the presign epoch when the body has signed URLs."""
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+    if signed:
+        epoch_start = datetime.fromtimestamp(presign_epoch() * max(1, PRESIGN_CACHE_MARGIN), timezone.utc)
+        updated_at = max(updated_at, epoch_start)
+    return updated_at.replace(microsecond=0)
+
+def _tags(header: str) -> list[str]:
+    return [t.strip().removeprefix("W/") for t in header.split(",") if t.strip()]
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def resource_validators(kind: str, resource_id: int, version: int, updated_at: datetime, url_key: str | None) -> tuple[str, datetime]:
+    """(ETag, Last-Modified) of one resource; `url_key` is the object key the body will sign, if any."""
+    signed = bool(url_key)
+    return resource_etag(kind, resource_id, version, signed), last_modified(updated_at, signed)
+
+def not_modified(request: Request, etag: str, modified: datetime | None = None) -> bool:
+    """True if the client's copy is current (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _tags(if_none_match)
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified <= since
+    return False
+
+def set_validators(response: Response, etag: str, modified: datetime | None = None):
+    response.headers["ETag"] = etag
+    if modified is not None:
+        response.headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    # Cacheable by the client only, and always revalidated
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def not_modified_response(etag: str, modified: datetime | None = None) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, modified)
+    return response
+
+def expected_versions(request: Request, kind: str, resource_id: int) -> list[int] | None:
+    """
+    Versions acceptable to the client's If-Match header, or None if it sent none
+    (or "*", which any existing resource satisfies). Raises 412 if no tag in it
+    refers to this resource.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    tags = [t for t in (x.strip() for x in if_match.split(",")) if t]
+    if "*" in tags:
+        return None
+    prefix = f"{kind}-{resource_id}-v"
+    versions = []
+    for tag in tags:
+        if tag.startswith("W/"):
+            continue  # If-Match uses strong comparison
+        body = tag.strip('"')
+        if body.startswith(prefix):
+            version = body[len(prefix):].split("-", 1)[0]
+            if version.isdigit():
+                versions.append(int(version))
+    if not versions:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Resource has changed")
+    return versions
@@ -0,0 +1,259 @@
+# content_store.py
+"""
+Content-addressed uploads with reference counting.
+
+An object's key is the SHA-256 of its bytes plus the lower-cased file
+extension. A file uploaded twice (e.g. the same resume sent to
+/careers/internal and /careers/cv_bank) is therefore transferred and stored once.
+
+Every such key has a `storage_objects` row:
+- `refcount` is the number of blog/career rows pointing at the key. crud.py
+  changes it in the same transaction as those rows (retain/drop).
+- `touched_at` is the last time an upload stored or reused the object.
+
+An object is deleted only after its row is claimed (status "deleting"). A row
+can be claimed only while its refcount is 0 and it hasn't been touched for
+STORAGE_REUSE_GRACE_SECONDS. So an upload that has just reused the object is
+safe until its own row commits. An upload that finds the row being deleted
+falls back to a random key.
+
+Keys from before this scheme are random uuid4 names. They have no row, and
+each belongs to exactly one blog or career.
+
+put() uploads before returning. put_later() only hashes the file into a local
+spool file; upload_spooled() then does the upload from a background worker
+(upload_queue.py).
+"""
+import asyncio
+import hashlib
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+
+import models
+from database import SessionLocal
+from metrics import STORAGE_UPLOADS
+from storage import MB, new_key, run_blocking
+
+STORAGE_REUSE_GRACE_SECONDS = float(os.getenv("STORAGE_REUSE_GRACE_SECONDS", "3600"))  # must exceed any request's upload-to-commit time
+HASH_CHUNK_SIZE = 1 * MB
+
+_release_tasks = set()
+
+# ----------------------
+# Uploads
+# ----------------------
+def _hash(file_obj):
+    """
+    (sha256 hex, size, file positioned at the data). Seekable inputs (request
+    uploads are already spooled) are read once and rewound; anything else is
+    spooled here while it is hashed.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    if file_obj.seekable():
+        start = file_obj.tell()
+        for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+        file_obj.seek(start)
+        return digest.hexdigest(), size, file_obj
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * MB)
+    for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        size += len(chunk)
+        spool.write(chunk)
+    spool.seek(0)
+    return digest.hexdigest(), size, spool
+
+def _spool(file_obj, spool_dir: str):
+    """(sha256 hex, size, path): copy the file into `spool_dir`, hashing it on the way."""
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=spool_dir, prefix="upload-", delete=False) as spool:
+        try:
+            for chunk in iter(lambda: file_obj.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            os.remove(spool.name)
+            raise
+    return digest.hexdigest(), size, spool.name
+
+def content_key(digest: str, filename: str | None) -> str:
+    ext = ""
+    if filename and "." in filename:
+        ext = "." + filename.rsplit(".", 1)[1].lower()
+    return f"{digest}{ext}"
+
+def _upsert(db):
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    return insert(models.StorageObject)
+
+async def _touch(bucket: str, key: str, size: int) -> str | None:
+    """Create or touch the key's row; returns its status, or None if it is being deleted."""
+    async with SessionLocal() as db:
+        stmt = _upsert(db).values(bucket=bucket, key=key, size=size, status="pending", refcount=0)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket", "key"],
+            set_={"touched_at": func.now()},
+            where=models.StorageObject.status != "deleting",
+        ).returning(models.StorageObject.status)
+        status = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+    return status
+
+async def _reserve(store, digest: str, size: int, filename: str | None) -> tuple[str, bool]:
+    """(key to use, whether it still needs uploading)."""
+    key = content_key(digest, filename)
+    status = await _touch(store.bucket, key, size)
+    if status == "stored":
+        STORAGE_UPLOADS.inc(bucket=store.bucket, result="reused")
+        return key, False
+    if status is None:
+        # Identical object is being deleted right now; don't race it
+        return new_key(filename), True
+    return key, True
+
+async def _upload(store, source, key: str):
+    await store.upload_fileobj(source, key=key)
+    async with SessionLocal() as db:
+        # No row for a fallback random key; the UPDATE then matches nothing
+        await db.execute(
+            update(models.StorageObject)
+            .where(models.StorageObject.bucket == store.bucket, models.StorageObject.key == key)
+            .values(status="stored", touched_at=func.now())
+        )
+        await db.commit()
+    STORAGE_UPLOADS.inc(bucket=store.bucket, result="stored")
+
+async def put(store, file_obj, filename: str | None = None) -> str:
+    """Store a file-like object under its content key, skipping the upload if it is already there."""
+    digest, size, source = await run_blocking(_hash, file_obj)
+    try:
+        key, needs_upload = await _reserve(store, digest, size, filename)
+        if needs_upload:
+            await _upload(store, source, key)
+        return key
+    finally:
+        if source is not file_obj:
+            source.close()
+
+async def put_later(store, file_obj, filename: str | None, spool_dir: str) -> tuple[str, str | None]:
+    """
+    Like put(), minus the upload: returns (key, spool file path for
+    upload_spooled()), or (key, None) if the object is already stored.
+    """
+    digest, size, path = await run_blocking(_spool, file_obj, spool_dir)
+    try:
+        key, needs_upload = await _reserve(store, digest, size, filename)
+    except BaseException:
+        os.remove(path)
+        raise
+    if not needs_upload:
+        os.remove(path)
+        return key, None
+    return key, path
+
+async def upload_spooled(store, key: str, path: str):
+    """Upload a put_later() spool file under `key` (the file is left for the caller to remove)."""
+    with open(path, "rb") as source:
+        await _upload(store, source, key)
+
+# ----------------------
+# Reference counts (inside the caller's transaction)
+# ----------------------
+def _by_count(keys) -> dict[int, list[str]]:
+    """{occurrences: [keys]} so each distinct delta is one UPDATE."""
+    counts = {}
+    for key in keys:
+        if key:
+            counts[key] = counts.get(key, 0) + 1
+    grouped = {}
+    for key, n in counts.items():
+        grouped.setdefault(n, []).append(key)
+    return grouped
+
+async def retain(db, store, keys):
+    """One reference more per occurrence of each key (rows now pointing at them)."""
+    for n, group in _by_count(keys).items():
+        await db.execute(
+            update(models.StorageObject)
+            .where(models.StorageObject.bucket == store.bucket, models.StorageObject.key.in_(group))
+            .values(refcount=models.StorageObject.refcount + n)
+        )
+
+async def drop(db, store, keys) -> list[str]:
+    """One reference less per occurrence; returns the keys nothing points at any more (release() them after commit)."""
+    freed = []
+    for n, group in _by_count(keys).items():
+        result = await db.execute(
+            update(models.StorageObject)
+            .where(models.StorageObject.bucket == store.bucket, models.StorageObject.key.in_(group))
+            .values(refcount=models.StorageObject.refcount - n)
+            .returning(models.StorageObject.key, models.StorageObject.refcount)
+        )
+        remaining = dict(result.all())
+        # Untracked (pre-dedup) keys belonged to this one row only
+        freed += [k for k in group if remaining.get(k, 0) <= 0]
+    return freed
+
+# ----------------------
+# Deletion
+# ----------------------
+async def release(store, keys, grace_seconds: float = STORAGE_REUSE_GRACE_SECONDS) -> tuple[list[str], list[str]]:
+    """
+    Delete objects that are unreferenced and untouched for `grace_seconds`.
+    Returns (deleted, failed); other keys are kept (referenced, or reused recently
+    -- storage_gc.py picks those up later).
+    """
+    keys = sorted({k for k in keys if k})
+    if not keys:
+        return [], []
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    table = models.StorageObject
+    in_bucket = (table.bucket == store.bucket, table.key.in_(keys))
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(table)
+            .where(*in_bucket, table.refcount <= 0, table.touched_at < cutoff)
+            .values(status="deleting")
+            .returning(table.key)
+        )
+        claimed = set(result.scalars())
+        tracked = set((await db.execute(select(table.key).where(*in_bucket))).scalars())
+        await db.commit()
+
+    deletable = [k for k in keys if k in claimed or k not in tracked]
+    failed = await store.delete_many(deletable)
+    gone = claimed - set(failed)
+    if gone:
+        async with SessionLocal() as db:
+            await db.execute(
+                delete(table).where(table.bucket == store.bucket, table.key.in_(gone), table.status == "deleting")
+            )
+            await db.commit()
+    return [k for k in deletable if k not in failed], failed
+
+async def _release_quietly(store, keys):
+    try:
+        await release(store, keys)
+    except Exception as e:
+        print(f"Releasing {len(keys)} object(s) from {store.bucket} failed (storage_gc.py will retry): {e}")
+
+def release_soon(store, keys):
+    """release() in the background, so a request doesn't wait on the storage round trips."""
+    if keys:
+        task = asyncio.create_task(_release_quietly(store, list(keys)))
+        _release_tasks.add(task)
+        task.add_done_callback(_release_tasks.discard)
+
+async def drain():
+    """Wait for background releases (shutdown, scripts)."""
+    if _release_tasks:
+        await asyncio.gather(*_release_tasks, return_exceptions=True)
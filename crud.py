@@ -1,20 +1,31 @@
 # crud.py
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, func, literal_column, insert, update, delete, union_all
+from sqlalchemy.exc import SQLAlchemyError
 import models, schemas
-from auth_utils import get_password_hash
+from hashing import hash_password
+from auth_utils import invalidate_user
+import blog_cache
+import content_store
+import jobs
+from skill_tags import normalize_skills, tag_new_careers, untag_career, untag_careers, retag_career
+from pagination import PageParams, fetch_page, fetch_ranked_page, estimate_count
+from s3_utils import storage as blogs_storage
+from aws_utils import storage as career_storage
 
 # -------------------- USER CRUD --------------------
+# Writes are single INSERT/UPDATE/DELETE ... RETURNING statements plus a commit:
+# no SELECT-before-write, no refresh-after-commit. Ownership checks go into the
+# WHERE clause (`owner_id`), so a None result means "missing or not yours".
 async def create_user(db: AsyncSession, user: schemas.UserCreate):
-    new_user = models.User(
+    stmt = insert(models.User).values(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password)
-    )
-    db.add(new_user)
+        hashed_password=await hash_password(user.password)
+    ).returning(models.User)
+    new_user = (await db.execute(stmt)).scalar_one()
     await db.commit()
-    await db.refresh(new_user)
     return new_user
 
 async def get_users(db: AsyncSession):
@@ -30,89 +41,280 @@ async def get_user_by_username(db: AsyncSession, username: str):
     return result.scalar_one_or_none()
 
 async def update_user(db: AsyncSession, user_id: int, updated_user: schemas.UserUpdate):
-    result = await db.execute(select(models.User).where(models.User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        return None
+    values = {}
     if updated_user.username is not None:
-        user.username = updated_user.username
+        values["username"] = updated_user.username
     if updated_user.email is not None:
-        user.email = updated_user.email
+        values["email"] = updated_user.email
     if updated_user.password is not None:
-        user.password = get_password_hash(updated_user.password)
+        values["hashed_password"] = await hash_password(updated_user.password)
+    if not values:
+        return await get_user_by_id(db, user_id)
+    stmt = update(models.User).where(models.User.id == user_id).values(**values).returning(models.User)
+    user = (await db.execute(stmt)).scalar_one_or_none()
     await db.commit()
-    await db.refresh(user)
+    if user:
+        # The caller holds the pre-update row and invalidates the old username
+        invalidate_user(user.username)
     return user
 
+# Account deletion (see account_deletion.py): deactivate_user locks the account
+# and queues the job in one transaction; the job then removes the user's rows in
+# batches and finally the user itself, with any late rows, in delete_user.
+async def deactivate_user(db: AsyncSession, user_id: int) -> str | None:
+    """Disable the account and queue its deletion; returns the job id, or None if already queued."""
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user_id, models.User.is_active.is_not(False))
+        .values(is_active=False)
+        .returning(models.User.username)
+    )
+    username = (await db.execute(stmt)).scalar_one_or_none()
+    if username is None:
+        return None
+    job_id = jobs.create(db, "account_deletion", {"user_id": user_id})
+    await db.commit()
+    invalidate_user(username)
+    return job_id
+
+async def _delete_owned_blogs(db: AsyncSession, user_id: int, limit: int | None = None) -> list[str | None]:
+    """Delete a user's blogs (the first `limit`, or all) in the caller's transaction; returns their image keys."""
+    ids = select(models.Blog.id).where(models.Blog.user_id == user_id).order_by(models.Blog.id)
+    if limit is not None:
+        ids = ids.limit(limit)
+    stmt = delete(models.Blog).where(models.Blog.id.in_(ids.scalar_subquery())).returning(models.Blog.image_url)
+    keys = list((await db.execute(stmt)).scalars())
+    if keys:
+        await blog_cache.notify(db, None)  # one message for the batch, not one per post
+    return keys
+
+async def _delete_owned_careers(db: AsyncSession, user_id: int, limit: int | None = None) -> list[str | None]:
+    """Delete a user's careers and their tag links in the caller's transaction; returns their resume keys."""
+    ids = select(models.Career.id).where(models.Career.user_id == user_id).order_by(models.Career.id)
+    if limit is not None:
+        ids = ids.limit(limit)
+    ids = list((await db.execute(ids)).scalars())
+    if not ids:
+        return []
+    await untag_careers(db, ids)
+    stmt = delete(models.Career).where(models.Career.id.in_(ids)).returning(models.Career.resume_url)
+    return list((await db.execute(stmt)).scalars())
+
+async def delete_user_blogs_batch(db: AsyncSession, user_id: int, limit: int) -> tuple[int, list[str]]:
+    """Delete up to `limit` of a user's blogs; returns (rows deleted, image keys no longer used)."""
+    keys = await _delete_owned_blogs(db, user_id, limit)
+    freed = await content_store.drop(db, blogs_storage, keys) if keys else []
+    await db.commit()
+    if keys:
+        blog_cache.invalidate()
+    return len(keys), freed
+
+async def delete_user_careers_batch(db: AsyncSession, user_id: int, limit: int) -> tuple[int, list[str]]:
+    """Delete up to `limit` of a user's careers (and their tag links); returns (rows deleted, resume keys no longer used)."""
+    keys = await _delete_owned_careers(db, user_id, limit)
+    if not keys:
+        return 0, []
+    freed = await content_store.drop(db, career_storage, keys)
+    await db.commit()
+    return len(keys), freed
+
 async def delete_user(db: AsyncSession, user_id: int):
-    result = await db.execute(select(models.User).where(models.User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    """
+    Delete the user and whatever it still owns. Other workers may accept the
+    deactivated account until their auth cache expires, so rows can appear
+    after the batches; locking the user row first makes such inserts wait
+    and then fail on the foreign key instead of outliving the account.
+    """
+    user = (await db.execute(select(models.User).where(models.User.id == user_id).with_for_update())).scalar_one_or_none()
+    if user is None:
+        await db.rollback()
         return None
-    await db.delete(user)
+    image_keys = await _delete_owned_blogs(db, user_id)
+    resume_keys = await _delete_owned_careers(db, user_id)
+    freed_images = await content_store.drop(db, blogs_storage, image_keys)
+    freed_resumes = await content_store.drop(db, career_storage, resume_keys)
+    await db.execute(delete(models.User).where(models.User.id == user_id))
     await db.commit()
+    if image_keys:
+        blog_cache.invalidate()
+    invalidate_user(user.username)
+    content_store.release_soon(blogs_storage, freed_images)
+    content_store.release_soon(career_storage, freed_resumes)
     return user
 
 # -------------------- BLOG CRUD --------------------
 async def create_blog(db: AsyncSession, blog: schemas.BlogCreate):
-    new_blog = models.Blog(
+    stmt = insert(models.Blog).values(
         title=blog.title,
         content=blog.content,
         image_url=blog.image_url,
-        user_id=getattr(blog, "user_id", None)
-    )
-    db.add(new_blog)
+        upload_status=_upload_status(blog.upload_status, blog.image_url),
+        user_id=blog.user_id
+    ).returning(models.Blog)
+    new_blog = (await db.execute(stmt)).scalar_one()
+    await content_store.retain(db, blogs_storage, [new_blog.image_url])
+    await blog_cache.notify(db, new_blog.id)
     await db.commit()
-    await db.refresh(new_blog)
+    blog_cache.invalidate(new_blog.id)
     return new_blog
 
-async def get_blogs(db: AsyncSession):
-    result = await db.execute(select(models.Blog))
-    return result.scalars().all()
+async def get_blogs(db: AsyncSession, page: PageParams, columns_only: bool = False):
+    # columns_only: plain Row tuples via Core, no ORM instances (fast list path)
+    query = select(*models.Blog.__table__.c) if columns_only else select(models.Blog)
+    blogs, next_cursor = await fetch_page(db, query, models.Blog.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return blogs, next_cursor, total
+
+async def get_user_blogs(db: AsyncSession, user_id: int, page: PageParams):
+    """One user's blogs, newest first (served by ix_blogs_user_id_id)."""
+    query = select(models.Blog).where(models.Blog.user_id == user_id)
+    blogs, next_cursor = await fetch_page(db, query, models.Blog.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return blogs, next_cursor, total
+
+async def get_blog_summaries(db: AsyncSession, page: PageParams, excerpt_length: int = 200):
+    """Listing rows without loading `content`: (id, title, image_url, upload_status, version, excerpt)."""
+    query = select(
+        models.Blog.id,
+        models.Blog.title,
+        models.Blog.image_url,
+        models.Blog.upload_status,
+        models.Blog.version,
+        func.substr(models.Blog.content, 1, excerpt_length).label("excerpt"),
+    )
+    rows, next_cursor = await fetch_page(db, query, models.Blog.id, page)
+    total = await estimate_count(db, select(models.Blog.id)) if page.include_total else None
+    return rows, next_cursor, total
 
 async def get_blog(db: AsyncSession, blog_id: int):
     result = await db.execute(select(models.Blog).where(models.Blog.id == blog_id))
     return result.scalar_one_or_none()
 
-async def update_blog(db: AsyncSession, blog_id: int, updated_blog: schemas.BlogCreate):
-    result = await db.execute(select(models.Blog).where(models.Blog.id == blog_id))
-    blog = result.scalar_one_or_none()
-    if not blog:
-        return None
-    blog.title = updated_blog.title
-    blog.content = updated_blog.content
-    blog.image_url = updated_blog.image_url or blog.image_url
+async def get_blog_version(db: AsyncSession, blog_id: int):
+    """(version, updated_at, image_url) for conditional GETs -- never loads `content`."""
+    result = await db.execute(
+        select(models.Blog.version, models.Blog.updated_at, models.Blog.image_url).where(models.Blog.id == blog_id)
+    )
+    return result.first()
+
+async def get_blog_owner(db: AsyncSession, blog_id: int):
+    """(exists, user_id) -- used only to pick 404 vs 403 after a guarded write matched nothing."""
+    result = await db.execute(select(models.Blog.user_id).where(models.Blog.id == blog_id))
+    row = result.first()
+    return (row is not None, row[0] if row else None)
+
+async def update_blog(db: AsyncSession, blog_id: int, updated_blog: schemas.BlogCreate, owner_id: int | None = None, expected_versions: list[int] | None = None):
+    # expected_versions: If-Match; the version check is part of the same UPDATE
+    old_image = None
+    if updated_blog.image_url:
+        # A replaced image loses a reference; lock the row so this is the key being replaced
+        old_image = await _locked_value(db, models.Blog.image_url, models.Blog.id == blog_id)
+    stmt = update(models.Blog).where(models.Blog.id == blog_id)
+    if owner_id is not None:
+        stmt = stmt.where(models.Blog.user_id == owner_id)
+    if expected_versions is not None:
+        stmt = stmt.where(models.Blog.version.in_(expected_versions))
+    stmt = stmt.values(
+        title=updated_blog.title,
+        content=updated_blog.content,
+        image_url=func.coalesce(updated_blog.image_url, models.Blog.image_url),
+        upload_status=func.coalesce(_upload_status(updated_blog.upload_status, updated_blog.image_url), models.Blog.upload_status),
+        version=models.Blog.version + 1,
+        updated_at=func.now(),
+    ).returning(models.Blog)
+    blog = (await db.execute(stmt)).scalar_one_or_none()
+    # No match (missing, not yours, stale If-Match): the new upload is unreferenced
+    freed = [updated_blog.image_url] if blog is None and updated_blog.image_url else []
+    if blog is not None:
+        await blog_cache.notify(db, blog_id)
+        freed = await _replace_key(db, blogs_storage, old_image, updated_blog.image_url)
     await db.commit()
-    await db.refresh(blog)
+    if blog is not None:
+        blog_cache.invalidate(blog_id)
+    content_store.release_soon(blogs_storage, freed)
     return blog
 
-async def delete_blog(db: AsyncSession, blog_id: int):
-    result = await db.execute(select(models.Blog).where(models.Blog.id == blog_id))
-    blog = result.scalar_one_or_none()
-    if not blog:
-        return None
-    await db.delete(blog)
+async def delete_blog(db: AsyncSession, blog_id: int, owner_id: int | None = None):
+    stmt = delete(models.Blog).where(models.Blog.id == blog_id)
+    if owner_id is not None:
+        stmt = stmt.where(models.Blog.user_id == owner_id)
+    blog = (await db.execute(stmt.returning(models.Blog))).scalar_one_or_none()
+    freed = []
+    if blog is not None:
+        await blog_cache.notify(db, blog_id)
+        freed = await content_store.drop(db, blogs_storage, [blog.image_url])
     await db.commit()
+    if blog is not None:
+        blog_cache.invalidate(blog_id)
+    content_store.release_soon(blogs_storage, freed)
     return blog
 
+async def set_blog_upload_status(db: AsyncSession, blog_id: int, image_key: str, status: str):
+    """Settle a write-behind upload; a no-op if the blog is gone or has another image by now."""
+    stmt = update(models.Blog).where(
+        models.Blog.id == blog_id,
+        models.Blog.image_url == image_key,
+        models.Blog.upload_status == "pending",
+    ).values(upload_status=status, version=models.Blog.version + 1, updated_at=func.now())
+    blog_id = (await db.execute(stmt.returning(models.Blog.id))).scalar_one_or_none()
+    if blog_id is not None:
+        await blog_cache.notify(db, blog_id)
+    await db.commit()
+    if blog_id is not None:
+        blog_cache.invalidate(blog_id)
+    return blog_id
+
 # -------------------- CAREER CRUD --------------------
 async def create_career(db: AsyncSession, career: schemas.CareerCreate, resume_url: str | None = None):
-    new_career = models.Career(
+    stmt = insert(models.Career).values(
         name=career.name,
         email=career.email,
         position=career.position,
         type=career.type,
         resume_url=resume_url or career.resume_url,
+        upload_status=_upload_status(career.upload_status, resume_url or career.resume_url),
         skills=career.skills,
-        user_id=getattr(career, "user_id", None)
-    )
-    db.add(new_career)
+        user_id=career.user_id
+    ).returning(models.Career)
+    new_career = (await db.execute(stmt)).scalar_one()
+    if new_career.skills:
+        await tag_new_careers(db, [(new_career.id, new_career.skills)])
+    await content_store.retain(db, career_storage, [new_career.resume_url])
     await db.commit()
-    await db.refresh(new_career)
     return new_career
 
-async def get_careers(db: AsyncSession, type: str | None = None, skill: str | None = None, position: str | None = None):
-    query = select(models.Career)
+async def bulk_create_careers(db: AsyncSession, rows: list[dict]):
+    """
+    Insert many careers (dicts of Career columns) as one multi-row
+    INSERT ... RETURNING in a single transaction.
+    If the chunk fails, fall back to one savepoint per row so a bad row only
+    fails itself. Returns (ids in input order with None for failures, {index: error}).
+    """
+    stmt = insert(models.Career).returning(models.Career.id, sort_by_parameter_order=True)
+    try:
+        ids = list((await db.execute(stmt, rows)).scalars())
+        await tag_new_careers(db, [(i, r.get("skills")) for i, r in zip(ids, rows)])
+        await content_store.retain(db, career_storage, [r.get("resume_url") for r in rows])
+        await db.commit()
+        return ids, {}
+    except SQLAlchemyError:
+        await db.rollback()
+
+    ids, errors = [], {}
+    for index, row in enumerate(rows):
+        try:
+            async with db.begin_nested():
+                career_id = (await db.execute(stmt, [row])).scalar_one()
+                await tag_new_careers(db, [(career_id, row.get("skills"))])
+                await content_store.retain(db, career_storage, [row.get("resume_url")])
+            ids.append(career_id)
+        except SQLAlchemyError as e:
+            ids.append(None)
+            errors[index] = str(getattr(e, "orig", None) or e)
+    await db.commit()
+    return ids, errors
+
+def _career_filters(type: str | None = None, skill: str | None = None, position: str | None = None) -> list:
     filters = []
     if type:
         filters.append(models.Career.type == type)
@@ -120,35 +322,226 @@ async def get_careers(db: AsyncSession, type: str | None = None, skill: str | No
         filters.append(models.Career.skills.ilike(f"%{skill}%"))
     if position:
         filters.append(models.Career.position.ilike(f"%{position}%"))
+    return filters
+
+async def get_careers(db: AsyncSession, page: PageParams, type: str | None = None, skill: str | None = None, position: str | None = None, columns_only: bool = False):
+    query = select(*models.Career.__table__.c) if columns_only else select(models.Career)
+    filters = _career_filters(type, skill, position)
     if filters:
         query = query.where(and_(*filters))
-    result = await db.execute(query)
-    return result.scalars().all()
+    careers, next_cursor = await fetch_page(db, query, models.Career.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return careers, next_cursor, total
+
+async def get_user_careers(db: AsyncSession, user_id: int, page: PageParams, type: str | None = None):
+    """One user's careers, newest first (served by ix_careers_user_id_id)."""
+    query = select(models.Career).where(models.Career.user_id == user_id)
+    if type:
+        query = query.where(models.Career.type == type)
+    careers, next_cursor = await fetch_page(db, query, models.Career.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return careers, next_cursor, total
+
+async def stream_careers(db: AsyncSession, type: str | None = None, skill: str | None = None, position: str | None = None, batch_size: int = 1000):
+    """
+    Yield every matching career as batches of Core rows, read through a
+    server-side cursor so memory stays flat regardless of table size.
+    """
+    query = select(*models.Career.__table__.c)
+    filters = _career_filters(type, skill, position)
+    if filters:
+        query = query.where(and_(*filters))
+    query = query.order_by(models.Career.id).execution_options(yield_per=batch_size)
+    result = await db.stream(query)
+    async for batch in result.partitions(batch_size):
+        yield batch
+
+async def search_careers(
+    db: AsyncSession,
+    page: PageParams,
+    q: str | None = None,
+    skills: list[str] | None = None,
+    match: str = "all",
+    position: str | None = None,
+    type: str | None = None,
+):
+    """
+    Ranked search over position + skills.
+    Postgres: full-text match on the indexed tsvector, ordered by ts_rank.
+    Other backends: ILIKE fallback, ordered by id.
+    Returns (careers, next_cursor, estimated_total).
+    """
+    skills = [s for s in (skills or []) if s]
+    filters = []
+    if type:
+        filters.append(models.Career.type == type)
+    if position:
+        filters.append(models.Career.position.ilike(f"%{position}%"))
+
+    if db.bind.dialect.name == "postgresql":
+        vector = literal_column(models.CAREER_SEARCH_VECTOR_SQL)
+        terms = [func.plainto_tsquery(literal_column("'simple'::regconfig"), s) for s in skills]
+        tsquery = None
+        for term in terms:
+            if tsquery is None:
+                tsquery = term
+            else:
+                tsquery = tsquery.op("&&" if match == "all" else "||")(term)
+        if q:
+            text_query = func.websearch_to_tsquery(literal_column("'simple'::regconfig"), q)
+            tsquery = text_query if tsquery is None else tsquery.op("&&")(text_query)
+        if tsquery is not None:
+            filters.append(vector.op("@@")(tsquery))
+            rank = func.ts_rank(vector, tsquery)
+            query = select(models.Career, rank).where(and_(*filters))
+            careers, next_cursor = await fetch_ranked_page(db, query, rank, models.Career.id, page)
+            total = await estimate_count(db, select(models.Career).where(and_(*filters))) if page.include_total else None
+            return careers, next_cursor, total
+    else:
+        skill_filters = [models.Career.skills.ilike(f"%{s}%") for s in skills]
+        if skill_filters:
+            filters.append(and_(*skill_filters) if match == "all" else or_(*skill_filters))
+        for word in (q or "").split():
+            filters.append(or_(models.Career.position.ilike(f"%{word}%"), models.Career.skills.ilike(f"%{word}%")))
+
+    query = select(models.Career)
+    if filters:
+        query = query.where(and_(*filters))
+    careers, next_cursor = await fetch_page(db, query, models.Career.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return careers, next_cursor, total
 
 async def get_career_by_id(db: AsyncSession, career_id: int):
     result = await db.execute(select(models.Career).where(models.Career.id == career_id))
     return result.scalar_one_or_none()
 
-async def update_career(db: AsyncSession, career_id: int, updated_career: schemas.CareerCreate):
-    result = await db.execute(select(models.Career).where(models.Career.id == career_id))
-    career = result.scalar_one_or_none()
-    if not career:
-        return None
-    career.name = updated_career.name
-    career.email = updated_career.email
-    career.position = updated_career.position
-    career.type = updated_career.type or career.type
-    career.skills = updated_career.skills or career.skills
-    career.resume_url = updated_career.resume_url or career.resume_url
+async def get_career_version(db: AsyncSession, career_id: int):
+    """(version, updated_at, resume_url) for conditional GETs."""
+    result = await db.execute(
+        select(models.Career.version, models.Career.updated_at, models.Career.resume_url).where(models.Career.id == career_id)
+    )
+    return result.first()
+
+async def get_career_owner(db: AsyncSession, career_id: int):
+    """(exists, user_id) -- used only to pick 404 vs 403 after a guarded write matched nothing."""
+    result = await db.execute(select(models.Career.user_id).where(models.Career.id == career_id))
+    row = result.first()
+    return (row is not None, row[0] if row else None)
+
+async def update_career(db: AsyncSession, career_id: int, updated_career: schemas.CareerUpdate, owner_id: int | None = None, expected_versions: list[int] | None = None):
+    old_resume = None
+    if updated_career.resume_url:
+        old_resume = await _locked_value(db, models.Career.resume_url, models.Career.id == career_id)
+    stmt = update(models.Career).where(models.Career.id == career_id)
+    if owner_id is not None:
+        stmt = stmt.where(models.Career.user_id == owner_id)
+    if expected_versions is not None:
+        stmt = stmt.where(models.Career.version.in_(expected_versions))
+    stmt = stmt.values(
+        name=updated_career.name,
+        email=updated_career.email,
+        position=updated_career.position,
+        type=func.coalesce(updated_career.type, models.Career.type),
+        skills=func.coalesce(updated_career.skills, models.Career.skills),
+        resume_url=func.coalesce(updated_career.resume_url, models.Career.resume_url),
+        upload_status=func.coalesce(_upload_status(updated_career.upload_status, updated_career.resume_url), models.Career.upload_status),
+        version=models.Career.version + 1,
+        updated_at=func.now(),
+    ).returning(models.Career)
+    career = (await db.execute(stmt)).scalar_one_or_none()
+    freed = [updated_career.resume_url] if career is None and updated_career.resume_url else []
+    if career and updated_career.skills is not None:
+        await retag_career(db, career.id, career.skills)
+    if career:
+        freed = await _replace_key(db, career_storage, old_resume, updated_career.resume_url)
     await db.commit()
-    await db.refresh(career)
+    content_store.release_soon(career_storage, freed)
     return career
 
-async def delete_career(db: AsyncSession, career_id: int):
-    result = await db.execute(select(models.Career).where(models.Career.id == career_id))
-    career = result.scalar_one_or_none()
-    if not career:
+async def delete_career(db: AsyncSession, career_id: int, owner_id: int | None = None):
+    where = models.Career.id == career_id
+    if owner_id is not None:
+        where = and_(where, models.Career.user_id == owner_id)
+    # Ownership first, with the row locked: only then touch the shared skill counts
+    if await _locked_value(db, models.Career.id, where) is None:
+        await db.rollback()
         return None
-    await db.delete(career)
+    # Unlink tags before the DELETE (the FK cascade would drop the links without fixing counts)
+    await untag_career(db, career_id)
+    career = (await db.execute(delete(models.Career).where(where).returning(models.Career))).scalar_one()
+    freed = await content_store.drop(db, career_storage, [career.resume_url])
     await db.commit()
+    content_store.release_soon(career_storage, freed)
     return career
+
+async def set_career_upload_status(db: AsyncSession, career_id: int, resume_key: str, status: str):
+    """Settle a write-behind upload; a no-op if the career is gone or has another resume by now."""
+    stmt = update(models.Career).where(
+        models.Career.id == career_id,
+        models.Career.resume_url == resume_key,
+        models.Career.upload_status == "pending",
+    ).values(upload_status=status, version=models.Career.version + 1, updated_at=func.now())
+    career_id = (await db.execute(stmt.returning(models.Career.id))).scalar_one_or_none()
+    await db.commit()
+    return career_id
+
+# -------------------- STORED OBJECT KEYS --------------------
+# Image/resume keys are reference counted (content_store.py) in the same
+# transaction as the rows that point at them.
+def _upload_status(status: str | None, key: str | None) -> str | None:
+    """Status written with a new key: the caller's ("pending" for write-behind), else "stored"."""
+    if not key:
+        return None
+    return status or "stored"
+
+async def _locked_value(db: AsyncSession, column, where):
+    result = await db.execute(select(column).where(where).with_for_update())
+    return result.scalar_one_or_none()
+
+async def _replace_key(db: AsyncSession, store, old_key: str | None, new_key: str | None) -> list[str]:
+    """Move one reference from old_key to new_key (None = unchanged); returns keys freed."""
+    if not new_key or new_key == old_key:
+        return []
+    await content_store.retain(db, store, [new_key])
+    return await content_store.drop(db, store, [old_key])
+
+async def stream_referenced_keys(db: AsyncSession, columns, batch_size: int = 1000):
+    """
+    Yield every non-null key held in `columns` (e.g. Blog.image_url), sorted in
+    byte order to match S3 listings, through a server-side cursor. A key stored
+    in several rows comes out several times.
+    """
+    keys = union_all(*(select(c.label("key")).where(c.is_not(None)) for c in columns)).subquery()
+    order = keys.c.key.collate("C") if db.bind.dialect.name == "postgresql" else keys.c.key  # SQLite compares bytes already
+    result = await db.stream_scalars(select(keys.c.key).order_by(order).execution_options(yield_per=batch_size))
+    async for key in result:
+        yield key
+
+# -------------------- SKILL TAGS --------------------
+async def get_careers_by_skills(db: AsyncSession, page: PageParams, tags: list[str], match: str = "all", type: str | None = None):
+    """Careers tagged with all (or any) of `tags`, served from the career_skills index."""
+    tags = normalize_skills(",".join(tags))
+    if not tags:
+        return [], None, 0
+    link = models.career_skills
+    matching = (
+        select(link.c.career_id)
+        .join(models.Skill, models.Skill.id == link.c.skill_id)
+        .where(models.Skill.name.in_(tags))
+    )
+    if match == "all":
+        matching = matching.group_by(link.c.career_id).having(func.count() == len(tags))
+    query = select(models.Career).where(models.Career.id.in_(matching))
+    if type:
+        query = query.where(models.Career.type == type)
+    careers, next_cursor = await fetch_page(db, query, models.Career.id, page)
+    total = await estimate_count(db, query) if page.include_total else None
+    return careers, next_cursor, total
+
+async def get_skill_facets(db: AsyncSession, limit: int = 50, prefix: str | None = None):
+    query = select(models.Skill).where(models.Skill.career_count > 0)
+    if prefix:
+        query = query.where(models.Skill.name.startswith(prefix.lower()))
+    query = query.order_by(models.Skill.career_count.desc(), models.Skill.name).limit(limit)
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -0,0 +1,106 @@
+# hashing.py
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from metrics import PASSWORD_HASH_SECONDS, timed
+
+# ----------------------
+# Config
+# ----------------------
+# Changing BCRYPT_ROUNDS is safe: existing hashes keep verifying and are
+# re-hashed at the new cost on the user's next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")  # "process" or "thread"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Hashes allowed in flight (running + queued in the pool) before callers have to wait
+PASSWORD_HASH_MAX_INFLIGHT = int(os.getenv("PASSWORD_HASH_MAX_INFLIGHT", str(PASSWORD_HASH_WORKERS * 4)))
+# How long a caller waits for a slot before getting 503; 0 rejects immediately
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# ----------------------
+# Blocking primitives (run inside the pool)
+# ----------------------
+def hash_password_sync(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_sync(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+# ----------------------
+# Pool + admission control
+# ----------------------
+_executor: Executor | None = None
+_slots: asyncio.Semaphore | None = None
+
+def _get_executor() -> Executor:
+    # Created lazily so importing this module (and forking workers) stays cheap
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+        else:
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+    return _executor
+
+async def _run(fn, *args):
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(PASSWORD_HASH_MAX_INFLIGHT)
+    try:
+        if PASSWORD_HASH_QUEUE_TIMEOUT <= 0:
+            if _slots.locked():
+                raise asyncio.TimeoutError
+            await _slots.acquire()
+        else:
+            await asyncio.wait_for(_slots.acquire(), timeout=PASSWORD_HASH_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        loop = asyncio.get_running_loop()
+        with timed(PASSWORD_HASH_SECONDS, operation=fn.__name__.removesuffix("_sync")):
+            return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _slots.release()
+
+def shutdown_hash_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+# ----------------------
+# Async API used by the routers / crud
+# ----------------------
+async def hash_password(password: str) -> str:
+    return await _run(hash_password_sync, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run(verify_password_sync, plain_password, hashed_password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a password; if the stored hash uses an outdated scheme or cost,
+    also return a fresh hash that the caller should persist (else None).
+    """
+    return await _run(verify_and_update_sync, plain_password, hashed_password)
@@ -0,0 +1,135 @@
+# jobs.py
+"""
+Background jobs that outlive the request that queued them (e.g. account deletion).
+
+State lives in the `jobs` table, so GET /jobs/{id} works on every worker and a
+job is never lost with its process: one interrupted by a shutdown goes back to
+"pending", one whose process died stops heartbeating, and either is picked up
+again by the next worker that starts (see resume()). Claiming is a single
+guarded UPDATE, so several workers resuming at once run each job only once.
+
+Handlers are registered per kind with @handler(kind) and must be idempotent:
+after a crash they run again from the start, with the progress saved so far.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import select, update, func
+
+import models
+from database import SessionLocal
+
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "300"))  # a running job without a heartbeat this long is resumed
+
+HANDLERS = {}
+_running: dict[str, asyncio.Task] = {}
+
+def handler(kind: str):
+    """Register `fn(job, params)` as the coroutine that runs jobs of `kind`."""
+    def register(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return register
+
+class JobContext:
+    """Handed to a handler: its job id plus a progress dict it saves with update()."""
+
+    def __init__(self, job_id: str, progress: dict | None):
+        self.id = job_id
+        self.progress = dict(progress or {})
+
+    async def update(self, **progress):
+        """Merge counters into the progress and save them; doubles as the heartbeat."""
+        self.progress.update(progress)
+        async with SessionLocal() as db:
+            await db.execute(
+                update(models.Job).where(models.Job.id == self.id).values(progress=self.progress, updated_at=func.now())
+            )
+            await db.commit()
+
+def create(db, kind: str, params: dict) -> str:
+    """Queue a job inside the caller's transaction; call start() once that commits."""
+    job_id = uuid4().hex
+    db.add(models.Job(id=job_id, kind=kind, params=params, status="pending", progress={}))
+    return job_id
+
+async def get(db, job_id: str):
+    return await db.get(models.Job, job_id)
+
+def start(job_id: str):
+    """Run a committed pending job in this worker (a no-op if another worker claimed it)."""
+    if job_id not in _running:
+        task = asyncio.create_task(_run(job_id))
+        _running[job_id] = task
+        task.add_done_callback(lambda _: _running.pop(job_id, None))
+
+async def _claim(job_id: str):
+    async with SessionLocal() as db:
+        result = await db.execute(
+            update(models.Job)
+            .where(models.Job.id == job_id, models.Job.status == "pending")
+            .values(status="running", updated_at=func.now())
+            .returning(models.Job.kind, models.Job.params, models.Job.progress)
+        )
+        row = result.one_or_none()
+        await db.commit()
+    return row
+
+async def _finish(job_id: str, status: str, progress: dict | None = None, error: str | None = None):
+    values = {"status": status, "updated_at": func.now(), "error": error}
+    if progress is not None:
+        values["progress"] = progress
+    async with SessionLocal() as db:
+        await db.execute(update(models.Job).where(models.Job.id == job_id).values(**values))
+        await db.commit()
+
+async def _run(job_id: str):
+    row = await _claim(job_id)
+    if row is None:
+        return
+    job = JobContext(job_id, row.progress)
+    try:
+        await HANDLERS[row.kind](job, row.params)
+    except asyncio.CancelledError:
+        raise  # shutdown; stop() puts the job back to pending
+    except Exception as e:
+        print(f"Job {job_id} ({row.kind}) failed: {type(e).__name__}: {e}")
+        await _finish(job_id, "failed", job.progress, f"{type(e).__name__}: {e}")
+    else:
+        await _finish(job_id, "done", job.progress)
+
+async def resume():
+    """Start jobs left pending, or running without a heartbeat, by earlier processes."""
+    stale = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(models.Job)
+            .where(models.Job.status == "running", models.Job.updated_at < stale)
+            .values(status="pending")
+        )
+        await db.commit()
+        result = await db.execute(
+            select(models.Job.id).where(models.Job.status == "pending", models.Job.kind.in_(list(HANDLERS)))
+        )
+        job_ids = list(result.scalars())
+    for job_id in job_ids:
+        start(job_id)
+    if job_ids:
+        print(f"Resumed {len(job_ids)} background job(s)")
+
+async def stop():
+    """Cancel this worker's jobs and hand them back (status pending) for the next start."""
+    tasks = dict(_running)
+    for task in tasks.values():
+        task.cancel()
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    if tasks:
+        async with SessionLocal() as db:
+            await db.execute(
+                update(models.Job)
+                .where(models.Job.id.in_(list(tasks)), models.Job.status == "running")
+                .values(status="pending")
+            )
+            await db.commit()
@@ -1,10 +1,25 @@
 # main.py
-from fastapi import FastAPI, Depends
-from database import engine, Base
-from routers import blogs, careers, auth, users
+import asyncio
+import os
+from fastapi import FastAPI, Depends, Response
+from fastapi.staticfiles import StaticFiles
+from database import log_engine_settings, dispose_engines
+from migrations import migrate
+from routers import blogs, careers, auth, users, health
+from routers import jobs as job_routes
 from aws_utils import init_s3 as init_career_s3
 from s3_utils import init_blogs_s3
 from auth_utils import get_current_user  # ✅ import your dependency
+from hashing import shutdown_hash_pool
+from storage import STORAGE_BACKEND, LOCAL_STORAGE_ROOT, LOCAL_STORAGE_URL
+from cache_utils import presigned_url_cache
+import auth_utils
+import blog_cache
+import content_store
+import jobs
+import upload_queue
+import account_deletion  # noqa: F401  (registers the account deletion job handler)
+import metrics
 
 # ✅ Define OpenAPI security scheme (for Swagger lock icons)
 openapi_security = {
@@ -36,6 +51,26 @@ app = FastAPI(
 # ==========================================================
 app.include_router(auth.router)  # login/register are public
 app.add_api_route("/", lambda: {"status": "App running successfully 🚀"}, tags=["Health Check"])
+app.include_router(health.router)  # /health/live, /health/ready
+app.include_router(job_routes.router)  # /jobs/{id}: unguessable ids, outlives the account that queued it
+
+# Read-your-writes across workers when read replicas are configured
+app.add_middleware(auth_utils.ReadYourWritesMiddleware)
+
+# ==========================================================
+# ⬇️ METRICS (Prometheus text format, per worker process)
+# ==========================================================
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.watch_cache("presigned_url", presigned_url_cache)
+    metrics.watch_cache("auth_token", auth_utils._token_cache)
+    metrics.watch_cache("auth_user", auth_utils._user_cache)
+    metrics.watch_cache("blog_pages", blog_cache.pages)
+    metrics.watch_cache("blog_posts", blog_cache.posts)
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # ==========================================================
 # ⬇️ PROTECTED ROUTERS (require valid token)
@@ -45,12 +80,56 @@ app.include_router(users.router, dependencies=[Depends(get_current_user)])
 app.include_router(blogs.router, dependencies=[Depends(get_current_user)])
 app.include_router(careers.router, dependencies=[Depends(get_current_user)])
 
+# Local filesystem storage backend (dev only): serve uploaded files directly
+if STORAGE_BACKEND == "local":
+    os.makedirs(LOCAL_STORAGE_ROOT, exist_ok=True)
+    app.mount(LOCAL_STORAGE_URL, StaticFiles(directory=LOCAL_STORAGE_ROOT), name="files")
+
 # ==========================================================
 # Startup events
 # ==========================================================
+# Schema changes are a deploy step (`python migrations.py`); only enable this
+# for single-process dev setups, never with several workers racing each other.
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "false").lower() == "true"
+
+_background_tasks = set()
+
+async def init_storage():
+    # Both buckets at once; uploads also create their bucket lazily, so a
+    # failure here is logged and left for /health/ready to report
+    results = await asyncio.gather(init_career_s3(), init_blogs_s3(), return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Storage init failed (will retry on first upload): {result}")
+
+async def resume_jobs():
+    # Jobs interrupted by the previous shutdown (or a crash) continue here
+    try:
+        await jobs.resume()
+    except Exception as e:
+        print(f"Could not resume background jobs: {e}")
+
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    init_career_s3()
-    init_blogs_s3()
+    log_engine_settings()
+    if RUN_MIGRATIONS_ON_STARTUP:
+        await migrate()
+    # Don't hold up startup on S3 round trips
+    task = asyncio.create_task(init_storage())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    blog_cache.start_listener()  # Postgres only: LISTEN for other workers' blog writes
+    upload_queue.start()  # UPLOAD_MODE=background only
+    task = asyncio.create_task(resume_jobs())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Runs after uvicorn has drained in-flight requests (WEB_GRACEFUL_TIMEOUT)
+    shutdown_hash_pool()
+    await upload_queue.drain()  # write-behind uploads of the last requests
+    await blog_cache.stop_listener()
+    await jobs.stop()  # running jobs go back to pending for the next worker
+    await content_store.drain()  # object deletions queued by the last requests
+    await dispose_engines()
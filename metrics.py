@@ -0,0 +1,277 @@
+# metrics.py
+"""
+Minimal in-process Prometheus metrics (text exposition format 0.0.4).
+Values are per worker process; scrape each worker or aggregate upstream.
+"""
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
+# Latency buckets in seconds: 1ms .. 10s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+# ----------------------
+# Metric types
+# ----------------------
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels[n] for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set_total(self, value: float, **labels):
+        # For totals counted elsewhere (e.g. TTLCache.hits) and mirrored at scrape time
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+Inf last), sum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][i] += 1
+            state[1] += value
+
+    def _render_sample(self, key, state) -> list[str]:
+        counts, total = state
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            le = 'le="' + _format_value(float(bound)) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+REGISTRY: list[_Metric] = []
+_collectors = []  # callables run right before rendering (for gauges read from elsewhere)
+
+def register_collector(fn):
+    _collectors.append(fn)
+    return fn
+
+def render() -> str:
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+@contextmanager
+def timed(histogram: Histogram, **labels):
+    """Observe the wall time of the `with` block (also when it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+# ----------------------
+# Metrics
+# ----------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request.", ("method", "route"), buckets=COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per HTTP request.", ("method", "route")
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency.", ("engine", "statement"))
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection.", ("engine",)
+)
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections", "Pooled DB connections by state.", ("engine", "state"))
+STORAGE_CALL_SECONDS = Histogram("storage_call_duration_seconds", "Object storage call latency.", ("bucket", "operation"))
+STORAGE_UPLOADS = Counter("storage_uploads_total", "Uploads by result: stored, reused an identical object, or failed (write-behind).", ("bucket", "result"))
+UPLOAD_QUEUE_DEPTH = Gauge("upload_queue_depth", "Write-behind uploads queued or in progress.", ("bucket",))
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_duration_seconds", "bcrypt time in the hash pool (excludes queueing).", ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+CACHE_HITS = Counter("cache_hits_total", "Cache hits.", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Cache misses.", ("cache",))
+CACHE_ENTRIES = Gauge("cache_entries", "Entries currently cached.", ("cache",))
+
+def watch_cache(name: str, cache):
+    """Export a cache_utils.TTLCache's stats() under cache="<name>"."""
+    @register_collector
+    def collect():
+        stats = cache.stats()
+        CACHE_HITS.set_total(stats["hits"], cache=name)
+        CACHE_MISSES.set_total(stats["misses"], cache=name)
+        CACHE_ENTRIES.set(stats["size"], cache=name)
+
+# ----------------------
+# Per-request DB accounting
+# ----------------------
+# [statement count, seconds] for the request being served; set by the middleware
+request_db_usage: contextvars.ContextVar = contextvars.ContextVar("request_db_usage", default=None)
+
+def _statement_kind(statement: str) -> str:
+    # First keyword only, so label cardinality stays small
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+def instrument_engine(async_engine, name: str = "primary"):
+    """Time every statement run on `async_engine` and charge it to the current request."""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_SECONDS.observe(elapsed, engine=name, statement=_statement_kind(statement))
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage[0] += 1
+            usage[1] += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        # after_cursor_execute doesn't fire for failed statements
+        conn = context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    pool = sync_engine.pool
+    if hasattr(pool, "checkedout"):
+        @register_collector
+        def collect():
+            DB_POOL_CONNECTIONS.set(pool.checkedout(), engine=name, state="checked_out")
+            DB_POOL_CONNECTIONS.set(pool.checkedin(), engine=name, state="idle")
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited."""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine=self.metrics_name)
+
+def timed_pool_class(name: str):
+    """Pool class for create_async_engine(poolclass=...) reporting under engine="<name>"."""
+    return type(f"TimedAsyncQueuePool_{name}", (TimedAsyncQueuePool,), {"metrics_name": name})
+
+# ----------------------
+# ASGI middleware
+# ----------------------
+class MetricsMiddleware:
+    """Request latency / in-flight / per-request DB usage, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        usage = [0, 0.0]
+        token = request_db_usage.set(usage)
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            request_db_usage.reset(token)
+            # The router stores the matched route in scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status_code))
+            HTTP_REQUEST_DB_QUERIES.observe(usage[0], method=method, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(usage[1], method=method, route=route)
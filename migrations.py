@@ -0,0 +1,116 @@
+# migrations.py
+"""
+Ordered, idempotent schema steps that Base.metadata.create_all can't express:
+Postgres-only indexes/extensions and changes to tables that already exist.
+
+Each step runs once per database and is recorded in `schema_migrations`.
+Run standalone with:  python migrations.py
+"""
+import asyncio
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, inspect, select, text
+
+import models  # noqa: F401  (registers all tables on Base.metadata)
+from database import Base, engine
+from skill_tags import backfill_career_skills
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("name", String(255), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+def add_column(table: str, column: str, ddl: str, sqlite_ddl: str | None = None, sqlite_backfill: str | None = None):
+    """
+    Step: ALTER TABLE ... ADD COLUMN unless create_all already made the column
+    (fresh databases). SQLite can't add a column with a non-constant default,
+    hence the separate DDL + backfill.
+    """
+    async def step(conn):
+        existing = await conn.run_sync(lambda sync_conn: {c["name"] for c in inspect(sync_conn).get_columns(table)})
+        if column in existing:
+            return
+        sqlite = conn.dialect.name == "sqlite"
+        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sqlite_ddl if sqlite and sqlite_ddl else ddl}"))
+        if sqlite and sqlite_backfill:
+            await conn.execute(text(f"UPDATE {table} SET {column} = {sqlite_backfill}"))
+    return step
+
+# (name, dialect or None for all backends, list of SQL strings / async callables taking the connection)
+MIGRATIONS = [
+    (
+        "0001_careers_search_indexes",
+        "postgresql",
+        [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"CREATE INDEX IF NOT EXISTS ix_careers_search ON careers USING gin ({models.CAREER_SEARCH_VECTOR_SQL})",
+            "CREATE INDEX IF NOT EXISTS ix_careers_skills_trgm ON careers USING gin (skills gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS ix_careers_position_trgm ON careers USING gin (position gin_trgm_ops)",
+        ],
+    ),
+    ("0002_backfill_career_skills", None, [backfill_career_skills]),
+    (
+        # Postgres 11+ adds these without rewriting the tables (constant / stable defaults)
+        "0003_blog_career_versions",
+        None,
+        [
+            step
+            for table in ("blogs", "careers")
+            for step in (
+                add_column(table, "version", "INTEGER NOT NULL DEFAULT 1"),
+                add_column(
+                    table, "updated_at", "TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()",
+                    sqlite_ddl="DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00'", sqlite_backfill="CURRENT_TIMESTAMP",
+                ),
+            )
+        ],
+    ),
+    (
+        # Plain CREATE INDEX locks writes on the table while it builds; on a large
+        # production table create these by hand with CONCURRENTLY first, and this
+        # step becomes a no-op.
+        "0004_owner_and_type_indexes",
+        None,
+        [
+            "CREATE INDEX IF NOT EXISTS ix_blogs_user_id_id ON blogs (user_id, id)",
+            "CREATE INDEX IF NOT EXISTS ix_careers_user_id_id ON careers (user_id, id)",
+            "CREATE INDEX IF NOT EXISTS ix_careers_type_id ON careers (type, id)",
+        ],
+    ),
+    (
+        # Everything uploaded so far was uploaded synchronously
+        "0005_upload_status",
+        None,
+        [
+            add_column("blogs", "upload_status", "VARCHAR(20)"),
+            add_column("careers", "upload_status", "VARCHAR(20)"),
+            "UPDATE blogs SET upload_status = 'stored' WHERE image_url IS NOT NULL AND upload_status IS NULL",
+            "UPDATE careers SET upload_status = 'stored' WHERE resume_url IS NOT NULL AND upload_status IS NULL",
+        ],
+    ),
+]
+
+async def run_migrations(conn):
+    """Apply pending MIGRATIONS on an open (transactional) AsyncConnection."""
+    await conn.run_sync(_meta.create_all)
+    applied = set((await conn.execute(select(schema_migrations.c.name))).scalars())
+    for name, dialect, steps in MIGRATIONS:
+        if name in applied:
+            continue
+        if dialect is None or conn.dialect.name == dialect:
+            for step in steps:
+                if callable(step):
+                    await step(conn)
+                else:
+                    await conn.execute(text(step))
+        await conn.execute(schema_migrations.insert().values(name=name))
+        print(f"Applied migration {name}")
+
+async def migrate():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await run_migrations(conn)
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
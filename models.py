@@ -1,24 +1,38 @@
 # models.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, ForeignKey, Table, Index, JSON, func
 from sqlalchemy.orm import relationship
 from database import Base
 
 # -------------------- BLOG MODEL --------------------
 class Blog(Base):
     __tablename__ = "blogs"
+    __table_args__ = (
+        Index("ix_blogs_user_id_id", "user_id", "id"),  # "my blogs" pages + FK lookups on user delete
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     image_url = Column(String(255), nullable=True)
+    upload_status = Column(String(20), nullable=True)  # of image_url: pending, stored or failed (None = no image)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Link to user
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every update (ETag)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Last-Modified
 
     user = relationship("User", backref="blogs")  # Optional back-reference to user
 
 
 # -------------------- CAREER MODEL --------------------
+# Full-text document for CV search. The GIN index in migrations.py is built on
+# exactly this expression, so queries must use it verbatim to hit the index.
+CAREER_SEARCH_VECTOR_SQL = "to_tsvector('simple'::regconfig, coalesce(position, '') || ' ' || coalesce(skills, ''))"
+
 class Career(Base):
     __tablename__ = "careers"
+    __table_args__ = (
+        Index("ix_careers_user_id_id", "user_id", "id"),  # "my careers" pages + FK lookups on user delete
+        Index("ix_careers_type_id", "type", "id"),        # keyset pages of /careers/cv_bank, /careers/?type=
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -27,11 +41,45 @@ class Career(Base):
     type = Column(String(50), nullable=False)  # "internal" or "cv_bank"
     skills = Column(Text, nullable=True)
     resume_url = Column(String(255), nullable=True)
+    upload_status = Column(String(20), nullable=True)  # of resume_url: pending, stored or failed (None = no resume)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # optional link to user
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # bumped on every update (ETag)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # Last-Modified
 
     user = relationship("User", backref="careers")  # Optional back-reference to user
 
 
+# -------------------- SKILL TAGS --------------------
+# Normalized copy of Career.skills (see skill_tags.py), kept in sync on every write
+career_skills = Table(
+    "career_skills",
+    Base.metadata,
+    Column("career_id", Integer, ForeignKey("careers.id", ondelete="CASCADE"), primary_key=True),
+    Column("skill_id", Integer, ForeignKey("skills.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_career_skills_skill_career", "skill_id", "career_id"),  # tag -> careers lookups
+)
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, index=True, nullable=False)  # lower-cased tag
+    career_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)  # facet count
+
+
+# -------------------- STORED OBJECTS --------------------
+# Content-addressed image/resume keys and how many rows use each (see content_store.py)
+class StorageObject(Base):
+    __tablename__ = "storage_objects"
+
+    bucket = Column(String(255), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    refcount = Column(Integer, nullable=False, default=0, server_default="0")  # blogs/careers pointing at it
+    status = Column(String(20), nullable=False, default="pending")  # pending (uploading), stored, deleting
+    size = Column(BigInteger, nullable=True)
+    touched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # last upload or reuse
+
+
 # -------------------- USER MODEL --------------------
 class User(Base):
     __tablename__ = "users"
@@ -42,3 +90,18 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# -------------------- BACKGROUND JOBS --------------------
+# See jobs.py; rows are the only state, so any worker can report on any job
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex, also the public handle
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    progress = Column(JSON, nullable=False, default=dict)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # heartbeat while running
@@ -0,0 +1,129 @@
+# pagination.py
+import base64
+import json
+import os
+from fastapi import HTTPException, Query, status
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# ----------------------
+# Config
+# ----------------------
+DEFAULT_PAGE_LIMIT = int(os.getenv("DEFAULT_PAGE_LIMIT", "50"))
+MAX_PAGE_LIMIT = int(os.getenv("MAX_PAGE_LIMIT", "200"))
+
+# ----------------------
+# Cursor utils
+# ----------------------
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor; 400 if it was tampered with."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or not values:
+            raise ValueError("empty cursor")
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+# ----------------------
+# Dependency for list endpoints
+# ----------------------
+class PageParams:
+    """Common `cursor` / `limit` / `include_total` query params for list endpoints."""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+        limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, description=f"Page size (capped at {MAX_PAGE_LIMIT})"),
+        include_total: bool = Query(False, description="Include a planner-estimated total row count"),
+    ):
+        self.cursor = cursor
+        self.limit = min(limit, MAX_PAGE_LIMIT)
+        self.include_total = include_total
+
+    @property
+    def after_id(self) -> int | None:
+        if self.cursor is None:
+            return None
+        value = decode_cursor(self.cursor)[-1]
+        if not isinstance(value, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return value
+
+    @property
+    def after_rank(self) -> tuple[float, int] | None:
+        """(rank, id) of the last row, for pages ordered by a relevance score."""
+        if self.cursor is None:
+            return None
+        values = decode_cursor(self.cursor)
+        if len(values) != 2 or not isinstance(values[0], (int, float)) or not isinstance(values[1], int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return float(values[0]), values[1]
+
+async def fetch_page(db: AsyncSession, query, id_column, page: PageParams):
+    """
+    Run `query` as a keyset page ordered by `id_column` descending (newest first).
+    `query` may select one ORM entity (rows are instances) or plain columns
+    including `id` (rows are Row tuples).
+    Fetches one extra row to know whether another page exists.
+    Returns (rows, next_cursor).
+    """
+    after_id = page.after_id
+    if after_id is not None:
+        query = query.where(id_column < after_id)
+    single_entity = len(query.column_descriptions) == 1
+    query = query.order_by(id_column.desc()).limit(page.limit + 1)
+    result = await db.execute(query)
+    rows = result.scalars().all() if single_entity else result.all()
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
+
+async def fetch_ranked_page(db: AsyncSession, query, rank_expr, id_column, page: PageParams):
+    """
+    Like fetch_page, but ordered by `rank_expr` descending with `id_column` as tie-breaker.
+    `query` must select (entity, rank). Returns (rows, next_cursor).
+    """
+    after = page.after_rank
+    if after is not None:
+        query = query.where(tuple_(rank_expr, id_column) < tuple_(*after))
+    query = query.order_by(rank_expr.desc(), id_column.desc()).limit(page.limit + 1)
+    result = await db.execute(query)
+    pairs = result.all()
+    next_cursor = None
+    if len(pairs) > page.limit:
+        pairs = pairs[: page.limit]
+        next_cursor = encode_cursor(float(pairs[-1][1]), pairs[-1][0].id)
+    return [row for row, _ in pairs], next_cursor
+
+# ----------------------
+# Cheap totals
+# ----------------------
+async def estimate_count(db: AsyncSession, query) -> int | None:
+    """
+    Planner row estimate for `query` (no COUNT(*) scan).
+    Only available on Postgres; returns None on other backends.
+    """
+    dialect = db.bind.dialect
+    if dialect.name != "postgresql":
+        return None
+    # Real bind parameters: filter text must never be parsed as SQL (or as ":name" binds).
+    # render_postcompile expands IN lists into one placeholder per element, as execute() would.
+    compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    conn = await db.connection()
+    result = await conn.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}", tuple(params[name] for name in compiled.positiontup)
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
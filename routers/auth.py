@@ -8,12 +8,12 @@ from datetime import timedelta
 import models, schemas
 from database import get_db
 from auth_utils import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     get_current_user,
+    invalidate_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from hashing import hash_password, verify_and_update_password
 
 router = APIRouter(tags=["Auth"], prefix="/auth")
 
@@ -30,7 +30,7 @@ async def register(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_d
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await hash_password(user_in.password)
     new_user = models.User(
         username=user_in.username,
         email=user_in.email,
@@ -47,14 +47,24 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     result = await db.execute(select(models.User).where(models.User.username == form_data.username))
     user = result.scalar_one_or_none()
 
+    valid, new_hash = False, None
+    if user and user.is_active is not False:  # deactivated = being deleted
+        valid, new_hash = await verify_and_update_password(form_data.password, user.hashed_password)
+
     # ✅ Correct status for invalid credentials
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Hash was made with an old cost factor -> upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(user.username)
+
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(data={"sub": user.username}, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
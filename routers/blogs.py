@@ -1,13 +1,21 @@
 # routers/blogs.py
-from fastapi import APIRouter, Depends, HTTPException, Response, status, UploadFile, File, Form
+import os
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File, Form, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-import schemas, crud, models
+import schemas, crud, models, blog_cache, conditional, upload_queue
 from database import get_db
-from s3_utils import upload_fileobj as upload_blog_fileobj, generate_presigned_url as blog_presigned
-from auth_utils import get_current_user
+from s3_utils import storage as blogs_storage, upload_fileobj as upload_blog_fileobj, generate_presigned_url as blog_presigned, generate_presigned_urls as blog_presigned_many
+from auth_utils import get_current_user, get_read_db
+from pagination import PageParams
+from serialization import FastJSONResponse
 
 router = APIRouter(tags=["Blogs"], prefix="/blogs")
 
+BLOG_EXCERPT_LENGTH = int(os.getenv("BLOG_EXCERPT_LENGTH", "200"))
+# Default for ?fast= on list endpoints (Core rows -> JSON bytes, no ORM / response_model pass)
+FAST_LISTS_DEFAULT = os.getenv("FAST_LISTS_DEFAULT", "false").lower() == "true"
+
 # CREATE BLOG
 @router.post("/", response_model=schemas.BlogOut, status_code=status.HTTP_201_CREATED)
 async def create_blog(
@@ -17,66 +25,151 @@ async def create_blog(
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    image_key = None
+    image_key = spooled = None
     if image:
         try:
-            image_key = upload_blog_fileobj(image.file, image.filename)
+            if upload_queue.BACKGROUND:
+                # Write-behind: only spooled here, uploaded after the response
+                image_key, spooled = await upload_queue.spool(blogs_storage, image.file, image.filename)
+            else:
+                image_key = await upload_blog_fileobj(image.file, image.filename)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Image upload failed: {e}")
 
-    blog_in = schemas.BlogCreate(title=title, content=content, image_url=image_key, user_id=current_user.id)
-    new_blog = await crud.create_blog(db, blog_in)
+    blog_in = schemas.BlogCreate(
+        title=title, content=content, image_url=image_key, user_id=current_user.id,
+        upload_status="pending" if spooled else None,
+    )
+    try:
+        new_blog = await crud.create_blog(db, blog_in)
+    except Exception:
+        upload_queue.discard(spooled)
+        raise
 
     if not new_blog:
         raise HTTPException(status_code=400, detail="Blog could not be created")
 
+    if spooled:
+        blog_id = new_blog.id
+        await upload_queue.enqueue(
+            blogs_storage, image_key, spooled,
+            lambda db, upload_status: crud.set_blog_upload_status(db, blog_id, image_key, upload_status),
+        )
+
     if new_blog.image_url:
         new_blog.image_url = blog_presigned(new_blog.image_url)
     return new_blog
 
 # GET ALL BLOGS
-@router.get("/", response_model=list[schemas.BlogOut])
-async def get_blogs(db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    blogs = await crud.get_blogs(db)
-    for b in blogs:
-        if b.image_url:
-            b.image_url = blog_presigned(b.image_url)
-    return blogs
+@router.get("/", response_model=schemas.BlogPage | schemas.BlogSummaryPage)
+async def get_blogs(
+    request: Request,
+    response: Response,
+    view: Literal["full", "summary"] = Query("full", description="'summary' returns title + excerpt without the full content"),
+    fast: bool = Query(FAST_LISTS_DEFAULT, description="Serialize straight from database rows"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    # Cached per worker as raw rows (image keys + version); URLs are signed per response
+    key = (view, page.cursor, page.limit, page.include_total)
+    cached = blog_cache.get_page(key)
+    if cached is None:
+        gen = blog_cache.generation()
+        async with blog_cache.fill_session(db) as fill_db:
+            if view == "summary":
+                rows, next_cursor, total = await crud.get_blog_summaries(fill_db, page, BLOG_EXCERPT_LENGTH)
+                fields = [*schemas.BlogSummary.model_fields, "version"]
+            else:
+                rows, next_cursor, total = await crud.get_blogs(fill_db, page, columns_only=True)
+                fields = [*schemas.BlogOut.model_fields, "version"]
+        cached = ([{f: r._mapping[f] for f in fields} for r in rows], next_cursor, total)
+        blog_cache.put_page(gen, key, cached)
+    rows, next_cursor, total = cached
+
+    signed = any(r["image_url"] for r in rows)
+    etag = conditional.list_etag(f"blogs-{view}", ((r["id"], r["version"]) for r in rows), next_cursor, signed)
+    if conditional.not_modified(request, etag):
+        return conditional.not_modified_response(etag)
+
+    urls = blog_presigned_many(r["image_url"] for r in rows)
+    items = [{**r, "image_url": urls.get(r["image_url"])} for r in rows]
+    for item in items:
+        del item["version"]
+    payload = {"items": items, "next_cursor": next_cursor, "estimated_total": total}
+    if fast:
+        response = FastJSONResponse(payload)
+        conditional.set_validators(response, etag)
+        return response
+    conditional.set_validators(response, etag)
+    return payload
 
 # GET SINGLE BLOG
 @router.get("/{blog_id}", response_model=schemas.BlogOut)
-async def get_blog(blog_id: int, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    blog = await crud.get_blog(db, blog_id)
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    if blog.image_url:
-        blog.image_url = blog_presigned(blog.image_url)
+async def get_blog(blog_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
+    blog = blog_cache.get_post(blog_id)
+    if blog is None and conditional.is_conditional(request):
+        # Revalidation: answer from the version row, without loading `content`
+        row = await crud.get_blog_version(db, blog_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        etag, modified = conditional.resource_validators("blog", blog_id, row.version, row.updated_at, row.image_url)
+        if conditional.not_modified(request, etag, modified):
+            return conditional.not_modified_response(etag, modified)
+    if blog is None:
+        gen = blog_cache.generation()
+        async with blog_cache.fill_session(db) as fill_db:
+            row = await crud.get_blog(fill_db, blog_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Blog not found")
+        blog = {**schemas.BlogOut.model_validate(row).model_dump(), "version": row.version, "updated_at": row.updated_at}
+        blog_cache.put_post(gen, blog_id, blog)
+
+    etag, modified = conditional.resource_validators("blog", blog_id, blog["version"], blog["updated_at"], blog["image_url"])
+    if conditional.not_modified(request, etag, modified):
+        return conditional.not_modified_response(etag, modified)
+    conditional.set_validators(response, etag, modified)
+    if blog["image_url"]:
+        blog = {**blog, "image_url": blog_presigned(blog["image_url"])}
     return blog
 
+# Guarded writes return None for "missing" and "not yours" alike;
+# only then do we spend a query to tell the two apart.
+async def _blog_write_error(db: AsyncSession, blog_id: int, action: str, user_id: int | None = None) -> HTTPException:
+    exists, owner_id = await crud.get_blog_owner(db, blog_id)
+    if not exists:
+        return HTTPException(status_code=404, detail="Blog not found")
+    if user_id is not None and owner_id == user_id:
+        # Owner matched, so it was the If-Match version check that failed
+        return HTTPException(status_code=412, detail="Blog has been modified since it was fetched")
+    return HTTPException(status_code=403, detail=f"Not authorized to {action} this blog")
+
 # UPDATE BLOG
 @router.put("/{blog_id}", response_model=schemas.BlogOut)
 async def update_blog(
     blog_id: int,
+    request: Request,
+    response: Response,
     title: str = Form(...),
     content: str = Form(...),
     image: UploadFile | None = File(None),
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    blog = await crud.get_blog(db, blog_id)
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    if blog.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this blog")
-
+    expected = conditional.expected_versions(request, "blog", blog_id)  # before uploading: a 412 here leaves nothing behind
     image_key = None
     if image:
         try:
-            image_key = upload_blog_fileobj(image.file, image.filename)
+            image_key = await upload_blog_fileobj(image.file, image.filename)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Image upload failed: {e}")
 
-    updated_blog = await crud.update_blog(db, blog_id, schemas.BlogCreate(title=title, content=content, image_url=image_key))
+    blog_in = schemas.BlogCreate(title=title, content=content, image_url=image_key)
+    updated_blog = await crud.update_blog(db, blog_id, blog_in, owner_id=current_user.id, expected_versions=expected)
+    if not updated_blog:
+        raise await _blog_write_error(db, blog_id, "update", current_user.id if expected else None)
+    etag, modified = conditional.resource_validators("blog", blog_id, updated_blog.version, updated_blog.updated_at, updated_blog.image_url)
+    conditional.set_validators(response, etag, modified)
     if updated_blog.image_url:
         updated_blog.image_url = blog_presigned(updated_blog.image_url)
     return updated_blog
@@ -84,11 +177,7 @@ async def update_blog(
 # DELETE BLOG
 @router.delete("/{blog_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_blog(blog_id: int, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    blog = await crud.get_blog(db, blog_id)
-    if not blog:
-        raise HTTPException(status_code=404, detail="Blog not found")
-    if blog.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this blog")
-
-    await crud.delete_blog(db, blog_id)
+    deleted = await crud.delete_blog(db, blog_id, owner_id=current_user.id)
+    if not deleted:
+        raise await _blog_write_error(db, blog_id, "delete")
     return Response(status_code=status.HTTP_204_NO_CONTENT)
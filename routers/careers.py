@@ -1,13 +1,84 @@
 # routers/careers.py
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, Query, Response
+import asyncio
+import csv
+import io
+import os
+from typing import Literal
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-import schemas, crud, models
-from database import get_db
-from aws_utils import upload_fileobj as career_upload, generate_presigned_url as career_presigned
-from auth_utils import get_current_user
+import schemas, crud, models, conditional, upload_queue
+from database import get_db, read_session
+from aws_utils import storage as career_storage, upload_fileobj as career_upload, generate_presigned_url as career_presigned, generate_presigned_urls as career_presigned_many
+from auth_utils import get_current_user, get_read_db
+from pagination import PageParams
+from serialization import FastJSONResponse, dumps
+from bulk_import import import_careers
 
 router = APIRouter(tags=["Careers"], prefix="/careers")
 
+# Default for ?fast= on list endpoints (Core rows -> JSON bytes, no ORM / response_model pass)
+FAST_LISTS_DEFAULT = os.getenv("FAST_LISTS_DEFAULT", "false").lower() == "true"
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FIELDS = ["id", "name", "email", "position", "skills", "type", "resume_url"]
+
+def _career_page(request: Request, response: Response, careers, next_cursor, total, fast: bool = False):
+    """
+    List response with an ETag over the page's (id, version)s; 304 if the client has it.
+    `careers` are ORM objects, or Core rows when fast=True (serialized straight to JSON bytes).
+    """
+    etag = conditional.list_etag(
+        "careers", ((c.id, c.version) for c in careers), next_cursor, any(c.resume_url for c in careers)
+    )
+    if conditional.not_modified(request, etag):
+        return conditional.not_modified_response(etag)
+    urls = career_presigned_many(c.resume_url for c in careers)
+    if fast:
+        items = [
+            {
+                "name": r.name,
+                "email": r.email,
+                "position": r.position,
+                "skills": r.skills,
+                "type": r.type,
+                "resume_url": urls.get(r.resume_url),
+                "upload_status": r.upload_status,
+                "id": r.id,
+            }
+            for r in careers
+        ]
+        response = FastJSONResponse({"items": items, "next_cursor": next_cursor, "estimated_total": total})
+        conditional.set_validators(response, etag)
+        return response
+    for c in careers:
+        if c.resume_url:
+            c.resume_url = urls[c.resume_url]
+    conditional.set_validators(response, etag)
+    return {"items": careers, "next_cursor": next_cursor, "estimated_total": total}
+
+async def _create_with_resume(db: AsyncSession, career_data: schemas.CareerCreate, resume: UploadFile | None):
+    """Upload the resume (or spool it for the upload queue, UPLOAD_MODE=background) and insert the career."""
+    spooled = None
+    if resume and upload_queue.BACKGROUND:
+        career_data.resume_url, spooled = await upload_queue.spool(career_storage, resume.file, resume.filename)
+        career_data.upload_status = "pending" if spooled else None
+    elif resume:
+        career_data.resume_url = await career_upload(resume.file, resume.filename)
+    try:
+        new_career = await crud.create_career(db, career_data)
+    except Exception:
+        upload_queue.discard(spooled)
+        raise
+    if spooled:
+        career_id, resume_key = new_career.id, new_career.resume_url
+        await upload_queue.enqueue(
+            career_storage, resume_key, spooled,
+            lambda db, upload_status: crud.set_career_upload_status(db, career_id, resume_key, upload_status),
+        )
+    if new_career.resume_url:
+        new_career.resume_url = career_presigned(new_career.resume_url)
+    return new_career
+
 # CREATE INTERNAL JOB
 @router.post("/internal", response_model=schemas.CareerOut, status_code=status.HTTP_201_CREATED)
 async def create_internal_career(
@@ -19,12 +90,8 @@ async def create_internal_career(
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    resume_key = career_upload(resume.file, resume.filename) if resume else None
-    career_data = schemas.CareerCreate(name=name, email=email, position=position, type="internal", resume_url=resume_key, skills=skills, user_id=current_user.id)
-    new_career = await crud.create_career(db, career_data, resume_key)
-    if new_career.resume_url:
-        new_career.resume_url = career_presigned(new_career.resume_url)
-    return new_career
+    career_data = schemas.CareerCreate(name=name, email=email, position=position, type="internal", skills=skills, user_id=current_user.id)
+    return await _create_with_resume(db, career_data, resume)
 
 # SUBMIT TO CV BANK
 @router.post("/cv_bank", response_model=schemas.CareerOut, status_code=status.HTTP_201_CREATED)
@@ -37,45 +104,139 @@ async def submit_cv_bank(
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    resume_key = career_upload(resume.file, resume.filename) if resume else None
-    career_data = schemas.CareerCreate(name=name, email=email, position=position, type="cv_bank", resume_url=resume_key, skills=skills, user_id=current_user.id)
-    new_career = await crud.create_career(db, career_data, resume_key)
-    if new_career.resume_url:
-        new_career.resume_url = career_presigned(new_career.resume_url)
-    return new_career
+    career_data = schemas.CareerCreate(name=name, email=email, position=position, type="cv_bank", skills=skills, user_id=current_user.id)
+    return await _create_with_resume(db, career_data, resume)
+
+# BULK IMPORT (manifest + zip of resumes)
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def bulk_import_careers(
+    manifest: UploadFile = File(..., description="NDJSON or CSV; columns name, email, position, skills, resume"),
+    resumes: UploadFile | None = File(None, description="Zip archive; manifest 'resume' values are member names"),
+    type: Literal["internal", "cv_bank"] = Form("cv_bank"),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    fmt = "csv" if (manifest.filename or "").lower().endswith(".csv") or manifest.content_type == "text/csv" else "ndjson"
+    return await import_careers(db, manifest.file, fmt, resumes.file if resumes else None, type, current_user.id)
 
 # GET CV BANK
-@router.get("/cv_bank", response_model=list[schemas.CareerOut])
-async def get_cv_bank(skill: str | None = Query(None), position: str | None = Query(None), db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    careers = await crud.get_careers(db, type="cv_bank", skill=skill, position=position)
-    for c in careers:
-        if c.resume_url:
-            c.resume_url = career_presigned(c.resume_url)
-    return careers
+@router.get("/cv_bank", response_model=schemas.CareerPage)
+async def get_cv_bank(request: Request, response: Response, skill: str | None = Query(None), position: str | None = Query(None), fast: bool = Query(FAST_LISTS_DEFAULT), page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
+    page_data = await crud.get_careers(db, page, type="cv_bank", skill=skill, position=position, columns_only=fast)
+    return _career_page(request, response, *page_data, fast=fast)
+
+# EXPORT CV BANK (streamed NDJSON / CSV)
+@router.get("/cv_bank/export")
+async def export_cv_bank(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    skill: str | None = Query(None),
+    position: str | None = Query(None),
+    current_user: models.User = Depends(get_current_user),
+):
+    async def body():
+        # Own session: it must stay open for as long as the response streams
+        async with read_session(current_user.id) as db:
+            if format == "csv":
+                yield ",".join(EXPORT_FIELDS) + "\r\n"
+            async for rows in crud.stream_careers(db, "cv_bank", skill, position, EXPORT_BATCH_SIZE):
+                urls = await asyncio.to_thread(career_presigned_many, [r.resume_url for r in rows])
+                records = [{**{f: r._mapping[f] for f in EXPORT_FIELDS}, "resume_url": urls.get(r.resume_url)} for r in rows]
+                if format == "csv":
+                    buf = io.StringIO()
+                    csv.DictWriter(buf, fieldnames=EXPORT_FIELDS).writerows(records)
+                    yield buf.getvalue()
+                else:
+                    yield b"".join(dumps(rec) + b"\n" for rec in records)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"cv_bank.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(body(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# SEARCH CV BANK (ranked full-text on Postgres)
+@router.get("/cv_bank/search", response_model=schemas.CareerPage)
+async def search_cv_bank(
+    request: Request,
+    response: Response,
+    q: str | None = Query(None, description="Free-text query over position and skills"),
+    skills: str | None = Query(None, description="Comma-separated skills, e.g. python,kubernetes"),
+    match: Literal["all", "any"] = Query("all", description="Require all skills or any of them"),
+    position: str | None = Query(None),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    skill_list = [s.strip() for s in skills.split(",")] if skills else []
+    page_data = await crud.search_careers(db, page, q=q, skills=skill_list, match=match, position=position, type="cv_bank")
+    return _career_page(request, response, *page_data)
+
+# FIND CAREERS BY SKILL TAGS
+@router.get("/skills", response_model=schemas.CareerPage)
+async def get_careers_by_skills(
+    request: Request,
+    response: Response,
+    tags: str = Query(..., description="Comma-separated skill tags, e.g. python,kubernetes"),
+    match: Literal["all", "any"] = Query("all"),
+    type: str | None = Query(None),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    page_data = await crud.get_careers_by_skills(db, page, tags.split(","), match=match, type=type)
+    return _career_page(request, response, *page_data)
+
+# SKILL FACET COUNTS
+@router.get("/skills/facets", response_model=list[schemas.SkillFacet])
+async def get_skill_facets(
+    limit: int = Query(50, ge=1, le=500),
+    prefix: str | None = Query(None),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    return await crud.get_skill_facets(db, limit=limit, prefix=prefix)
 
 # GET ALL CAREERS
-@router.get("/", response_model=list[schemas.CareerOut])
-async def get_careers(type: str | None = None, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    careers = await crud.get_careers(db, type)
-    for c in careers:
-        if c.resume_url:
-            c.resume_url = career_presigned(c.resume_url)
-    return careers
+@router.get("/", response_model=schemas.CareerPage)
+async def get_careers(request: Request, response: Response, type: str | None = None, fast: bool = Query(FAST_LISTS_DEFAULT), page: PageParams = Depends(), db: AsyncSession = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
+    page_data = await crud.get_careers(db, page, type, columns_only=fast)
+    return _career_page(request, response, *page_data, fast=fast)
 
 # GET SINGLE CAREER
 @router.get("/{career_id}", response_model=schemas.CareerOut)
-async def get_career(career_id: int, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+async def get_career(career_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
+    if conditional.is_conditional(request):
+        # Revalidation: answer from the version row before loading the record
+        row = await crud.get_career_version(db, career_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Career not found")
+        etag, modified = conditional.resource_validators("career", career_id, row.version, row.updated_at, row.resume_url)
+        if conditional.not_modified(request, etag, modified):
+            return conditional.not_modified_response(etag, modified)
     career = await crud.get_career_by_id(db, career_id)
     if not career:
         raise HTTPException(status_code=404, detail="Career not found")
+    etag, modified = conditional.resource_validators("career", career_id, career.version, career.updated_at, career.resume_url)
+    conditional.set_validators(response, etag, modified)
     if career.resume_url:
         career.resume_url = career_presigned(career.resume_url)
     return career
 
+# Guarded writes return None for "missing" and "not yours" alike;
+# only then do we spend a query to tell the two apart.
+async def _career_write_error(db: AsyncSession, career_id: int, user_id: int | None = None) -> HTTPException:
+    exists, owner_id = await crud.get_career_owner(db, career_id)
+    if not exists:
+        return HTTPException(status_code=404, detail="Career not found")
+    if user_id is not None and owner_id == user_id:
+        # Owner matched, so it was the If-Match version check that failed
+        return HTTPException(status_code=412, detail="Career has been modified since it was fetched")
+    return HTTPException(status_code=403, detail="Not authorized")
+
 # UPDATE CAREER
 @router.put("/{career_id}", response_model=schemas.CareerOut)
 async def update_career(
     career_id: int,
+    request: Request,
+    response: Response,
     name: str = Form(...),
     email: str = Form(...),
     position: str = Form(...),
@@ -85,12 +246,14 @@ async def update_career(
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    career = await crud.get_career_by_id(db, career_id)
-    if career.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    resume_key = career_upload(resume.file, resume.filename) if resume else None
-    update_data = schemas.CareerCreate(name=name, email=email, position=position, type=type or career.type, resume_url=resume_key, skills=skills, user_id=current_user.id)
-    updated_career = await crud.update_career(db, career_id, update_data)
+    expected = conditional.expected_versions(request, "career", career_id)
+    resume_key = await career_upload(resume.file, resume.filename) if resume else None
+    update_data = schemas.CareerUpdate(name=name, email=email, position=position, type=type, resume_url=resume_key, skills=skills)
+    updated_career = await crud.update_career(db, career_id, update_data, owner_id=current_user.id, expected_versions=expected)
+    if not updated_career:
+        raise await _career_write_error(db, career_id, current_user.id if expected else None)
+    etag, modified = conditional.resource_validators("career", career_id, updated_career.version, updated_career.updated_at, updated_career.resume_url)
+    conditional.set_validators(response, etag, modified)
     if updated_career.resume_url:
         updated_career.resume_url = career_presigned(updated_career.resume_url)
     return updated_career
@@ -98,8 +261,7 @@ async def update_career(
 # DELETE CAREER
 @router.delete("/{career_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_career(career_id: int, db: AsyncSession = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    career = await crud.get_career_by_id(db, career_id)
-    if career.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    await crud.delete_career(db, career_id)
+    deleted = await crud.delete_career(db, career_id, owner_id=current_user.id)
+    if not deleted:
+        raise await _career_write_error(db, career_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,67 @@
+# routers/health.py
+import asyncio
+import os
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from database import engine
+from s3_utils import storage as blogs_storage
+from aws_utils import storage as career_storage
+
+router = APIRouter(tags=["Health Check"], prefix="/health")
+
+# A probe result is reused this long, so frequent probes from every replica
+# of the deployment don't turn into a stream of queries against Postgres/S3
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2"))
+
+async def _check_database():
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+CHECKS = {
+    "database": _check_database,
+    "blogs_storage": blogs_storage.check,
+    "career_storage": career_storage.check,
+}
+
+_results: dict[str, tuple[float, str]] = {}  # name -> (checked at, "ok" or error)
+_locks: dict[str, asyncio.Lock] = {}
+
+async def _cached_check(name: str) -> str:
+    cached = _results.get(name)
+    if cached and time.monotonic() - cached[0] < HEALTH_CACHE_SECONDS:
+        return cached[1]
+    lock = _locks.setdefault(name, asyncio.Lock())
+    async with lock:
+        # Concurrent probes wait for the one check already running
+        cached = _results.get(name)
+        if cached and time.monotonic() - cached[0] < HEALTH_CACHE_SECONDS:
+            return cached[1]
+        try:
+            await asyncio.wait_for(CHECKS[name](), timeout=HEALTH_CHECK_TIMEOUT)
+            outcome = "ok"
+        except asyncio.TimeoutError:
+            outcome = f"timed out after {HEALTH_CHECK_TIMEOUT}s"
+        except Exception as e:
+            outcome = f"{type(e).__name__}: {e}"
+        _results[name] = (time.monotonic(), outcome)
+        return outcome
+
+# Liveness: the process is up and its event loop responds; never touches dependencies
+@router.get("/live")
+async def live():
+    return {"status": "ok"}
+
+# Readiness: database and both buckets reachable (results cached for HEALTH_CACHE_SECONDS)
+@router.get("/ready")
+async def ready():
+    names = list(CHECKS)
+    outcomes = await asyncio.gather(*(_cached_check(n) for n in names))
+    checks = dict(zip(names, outcomes))
+    healthy = all(v == "ok" for v in checks.values())
+    return JSONResponse(
+        {"status": "ok" if healthy else "unavailable", "checks": checks},
+        status_code=200 if healthy else 503,
+    )
@@ -0,0 +1,18 @@
+# routers/jobs.py
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+import schemas, jobs
+from database import get_db
+
+router = APIRouter(tags=["Jobs"], prefix="/jobs")
+
+# -------------------- JOB STATUS --------------------
+# Public: the id is an unguessable uuid handed only to whoever queued the job,
+# and e.g. an account deletion outlives the token that started it
+@router.get("/{job_id}", response_model=schemas.JobOut)
+async def get_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
+    job = await jobs.get(db, job_id.hex)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -1,9 +1,13 @@
 # routers/users.py
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-import models, schemas, crud
+import models, schemas, crud, jobs
 from database import get_db
-from auth_utils import get_current_user
+from auth_utils import get_current_user, get_read_db, invalidate_user
+from pagination import PageParams
+from s3_utils import generate_presigned_urls as blog_presigned_many
+from aws_utils import generate_presigned_urls as career_presigned_many
 
 router = APIRouter(tags=["Users"], prefix="/users")
 
@@ -12,6 +16,34 @@ router = APIRouter(tags=["Users"], prefix="/users")
 async def get_me(current_user: models.User = Depends(get_current_user)):
     return current_user
 
+# -------------------- MY BLOGS / MY CAREERS --------------------
+@router.get("/me/blogs", response_model=schemas.BlogPage)
+async def get_my_blogs(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    blogs, next_cursor, total = await crud.get_user_blogs(db, current_user.id, page)
+    urls = blog_presigned_many(b.image_url for b in blogs)
+    for b in blogs:
+        if b.image_url:
+            b.image_url = urls[b.image_url]
+    return {"items": blogs, "next_cursor": next_cursor, "estimated_total": total}
+
+@router.get("/me/careers", response_model=schemas.CareerPage)
+async def get_my_careers(
+    type: Literal["internal", "cv_bank"] | None = Query(None),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    careers, next_cursor, total = await crud.get_user_careers(db, current_user.id, page, type=type)
+    urls = career_presigned_many(c.resume_url for c in careers)
+    for c in careers:
+        if c.resume_url:
+            c.resume_url = urls[c.resume_url]
+    return {"items": careers, "next_cursor": next_cursor, "estimated_total": total}
+
 # -------------------- UPDATE CURRENT USER --------------------
 @router.put("/me", response_model=schemas.UserOut)
 async def update_me(
@@ -27,17 +59,25 @@ async def update_me(
         password=password
     )
     updated_user = await crud.update_user(db, current_user.id, update_data)
+    invalidate_user(current_user.username)
     if not updated_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Update failed")
     return updated_user
 
 # -------------------- DELETE CURRENT USER --------------------
-@router.delete("/me", response_model=schemas.UserOut)
+# Returns at once: the account is disabled now, its blogs, careers and files are
+# removed by a background job (account_deletion.py) whose progress is at /jobs/{id}
+@router.delete("/me", response_model=schemas.JobAccepted, status_code=status.HTTP_202_ACCEPTED)
 async def delete_me(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    deleted_user = await crud.delete_user(db, current_user.id)
-    if not deleted_user:
+    job_id = await crud.deactivate_user(db, current_user.id)
+    invalidate_user(current_user.username)
+    if not job_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Delete failed")
-    return deleted_user
+    jobs.start(job_id)
+    status_url = f"/jobs/{job_id}"
+    response.headers["Location"] = status_url
+    return {"job_id": job_id, "status_url": status_url}
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
+from datetime import datetime
 
 # ===============================
 # 🔹 USER SCHEMAS
@@ -49,14 +50,36 @@ class BlogBase(BaseModel):
     image_url: Optional[str] = None  # ✅ Added for image support
 
 class BlogCreate(BlogBase):
-    pass
+    user_id: Optional[int] = None  # owner, set by the router from the token
+    upload_status: Optional[str] = None  # "pending" for write-behind uploads; default "stored" if image_url
 
 class BlogOut(BlogBase):
     id: int
+    upload_status: Optional[str] = None  # image_url works once this is "stored"
+
+    class Config:
+        from_attributes = True
+
+class BlogSummary(BaseModel):
+    id: int
+    title: str
+    image_url: Optional[str] = None
+    upload_status: Optional[str] = None
+    excerpt: str  # first BLOG_EXCERPT_LENGTH chars of content, cut in the database
 
     class Config:
         from_attributes = True
 
+class BlogPage(BaseModel):
+    items: list[BlogOut]
+    next_cursor: Optional[str] = None     # pass back as ?cursor= for the next page
+    estimated_total: Optional[int] = None  # planner estimate, only with ?include_total=true
+
+class BlogSummaryPage(BaseModel):
+    items: list[BlogSummary]
+    next_cursor: Optional[str] = None
+    estimated_total: Optional[int] = None
+
 # ===============================
 # 🔹 CAREER SCHEMAS
 # ===============================
@@ -70,10 +93,64 @@ class CareerBase(BaseModel):
     resume_url: Optional[str] = None
 
 class CareerCreate(CareerBase):
-    pass
+    user_id: Optional[int] = None  # owner, set by the router from the token
+    upload_status: Optional[str] = None  # "pending" for write-behind uploads; default "stored" if resume_url
+
+class CareerUpdate(BaseModel):
+    name: str
+    email: EmailStr
+    position: str
+    # None keeps the stored value
+    skills: Optional[str] = None
+    type: Optional[str] = None
+    resume_url: Optional[str] = None
+    upload_status: Optional[str] = None
 
 class CareerOut(CareerBase):
     id: int
+    upload_status: Optional[str] = None  # resume_url works once this is "stored"
+
+    class Config:
+        from_attributes = True
+
+class CareerPage(BaseModel):
+    items: list[CareerOut]
+    next_cursor: Optional[str] = None
+    estimated_total: Optional[int] = None
+
+class BulkImportError(BaseModel):
+    row: int  # 1-based row number in the manifest
+    error: str
+
+class BulkImportResult(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    ids: list[int] = []
+    errors: list[BulkImportError] = []
+
+class SkillFacet(BaseModel):
+    name: str
+    count: int = Field(validation_alias="career_count")
+
+    class Config:
+        from_attributes = True
+
+# ===============================
+# 🔹 JOB SCHEMAS
+# ===============================
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status_url: str  # poll with GET; needs no token (the account may be gone by then)
+
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: str  # pending, running, done, failed
+    progress: dict = {}
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,24 @@
+# serialization.py
+import json
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json works, just slower
+    orjson = None
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode()
+
+class FastJSONResponse(Response):
+    """
+    JSON response for payloads that are already plain dicts/lists of JSON types.
+    Returning it from a handler skips FastAPI's response_model validation, so the
+    handler is responsible for producing exactly the documented shape.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,112 @@
+# skill_tags.py
+import re
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects import postgresql, sqlite
+import models
+
+MAX_TAG_LENGTH = 100
+BACKFILL_BATCH_SIZE = 1000
+
+_SEPARATORS = re.compile(r"[,;|/\n]+")
+
+def normalize_skills(skills: str | None) -> list[str]:
+    """'Python, kubernetes; PYTHON ' -> ['python', 'kubernetes'] (order kept, duplicates dropped)."""
+    tags = []
+    for part in _SEPARATORS.split(skills or ""):
+        tag = " ".join(part.split()).lower()[:MAX_TAG_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def _dialect_name(db) -> str:
+    # Works for both AsyncSession and AsyncConnection
+    bind = getattr(db, "bind", None) or db
+    return bind.dialect.name
+
+def _insert_ignore(db, table):
+    """INSERT ... ON CONFLICT DO NOTHING for the backends we run on."""
+    insert = postgresql.insert if _dialect_name(db) == "postgresql" else sqlite.insert
+    return insert(table).on_conflict_do_nothing()
+
+async def _skill_ids(db, names) -> list[int]:
+    result = await db.execute(select(models.Skill.id).where(models.Skill.name.in_(names)))
+    return list(result.scalars())
+
+async def _link_tags(db, careers) -> dict[int, int]:
+    """
+    Create missing tags and link rows for new careers given as (career_id, skills text).
+    Returns {skill_id: number of careers linked} so callers can adjust counts.
+    """
+    tagged = [(career_id, normalize_skills(skills)) for career_id, skills in careers]
+    names = {tag for _, tags in tagged for tag in tags}
+    if not names:
+        return {}
+    await db.execute(_insert_ignore(db, models.Skill.__table__), [{"name": n, "career_count": 0} for n in names])
+    result = await db.execute(select(models.Skill.id, models.Skill.name).where(models.Skill.name.in_(names)))
+    ids = {name: skill_id for skill_id, name in result.all()}
+    links = [{"career_id": cid, "skill_id": ids[tag]} for cid, tags in tagged for tag in tags]
+    await db.execute(_insert_ignore(db, models.career_skills), links)
+    added = {}
+    for link in links:
+        added[link["skill_id"]] = added.get(link["skill_id"], 0) + 1
+    return added
+
+async def tag_new_careers(db, careers):
+    """Tag freshly inserted careers given as [(career_id, skills text)] and bump their counts."""
+    added = await _link_tags(db, careers)
+    await _bump_counts(db, added, +1)
+
+async def _bump_counts(db, per_skill: dict[int, int], sign: int):
+    # One UPDATE per distinct delta instead of one per tag
+    by_delta = {}
+    for skill_id, n in per_skill.items():
+        by_delta.setdefault(n, []).append(skill_id)
+    for n, ids in by_delta.items():
+        await db.execute(
+            update(models.Skill).where(models.Skill.id.in_(ids)).values(career_count=models.Skill.career_count + sign * n)
+        )
+
+async def untag_career(db, career_id: int):
+    """Remove all tag links of a career and decrement their counts."""
+    await untag_careers(db, [career_id])
+
+async def untag_careers(db, career_ids: list[int]):
+    """Remove all tag links of several careers in one statement and decrement their counts."""
+    result = await db.execute(
+        delete(models.career_skills)
+        .where(models.career_skills.c.career_id.in_(career_ids))
+        .returning(models.career_skills.c.skill_id)
+    )
+    removed = {}
+    for skill_id in result.scalars():
+        removed[skill_id] = removed.get(skill_id, 0) + 1
+    await _bump_counts(db, removed, -1)
+
+async def retag_career(db, career_id: int, skills: str | None):
+    """Replace a career's tags after its skills text changed."""
+    await untag_career(db, career_id)
+    await tag_new_careers(db, [(career_id, skills)])
+
+async def backfill_career_skills(conn):
+    """Migration step: build tags for every existing career, then recompute all counts."""
+    last_id = 0
+    while True:
+        result = await conn.execute(
+            select(models.Career.id, models.Career.skills)
+            .where(models.Career.id > last_id)
+            .order_by(models.Career.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        await _link_tags(conn, [(row.id, row.skills) for row in rows])
+
+    counts = (
+        select(func.count())
+        .where(models.career_skills.c.skill_id == models.Skill.id)
+        .scalar_subquery()
+    )
+    await conn.execute(update(models.Skill).values(career_count=counts))
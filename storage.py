@@ -0,0 +1,238 @@
+# storage.py
+import asyncio
+import functools
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from cache_utils import cached_presign
+from metrics import STORAGE_CALL_SECONDS, timed
+
+# ----------------------
+# Config
+# ----------------------
+MB = 1024 * 1024
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")  # "s3" or "local"
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "./storage")
+LOCAL_STORAGE_URL = os.getenv("LOCAL_STORAGE_URL", "/files")  # where main.py mounts LOCAL_STORAGE_ROOT
+
+STORAGE_MAX_POOL_CONNECTIONS = int(os.getenv("STORAGE_MAX_POOL_CONNECTIONS", "50"))
+STORAGE_MAX_WORKERS = int(os.getenv("STORAGE_MAX_WORKERS", "16"))
+STORAGE_MULTIPART_THRESHOLD = int(os.getenv("STORAGE_MULTIPART_THRESHOLD_MB", "8")) * MB
+STORAGE_MULTIPART_CHUNKSIZE = int(os.getenv("STORAGE_MULTIPART_CHUNKSIZE_MB", "8")) * MB
+STORAGE_MULTIPART_CONCURRENCY = int(os.getenv("STORAGE_MULTIPART_CONCURRENCY", "8"))
+S3_DELETE_BATCH = 1000  # most keys DeleteObjects accepts per request
+S3_LIST_PAGE = 1000     # most keys ListObjectsV2 returns per request
+
+# Blocking storage calls run here instead of on the event loop
+_executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+def new_key(filename: str | None = None) -> str:
+    """Unique object key, keeping the file extension of `filename` if it has one."""
+    ext = ""
+    if filename and "." in filename:
+        ext = "." + filename.rsplit(".", 1)[1]
+    return f"{uuid4().hex}{ext}"
+
+# ----------------------
+# S3 backend
+# ----------------------
+class S3Storage:
+    def __init__(self, bucket: str, region: str, access_key: str, secret_key: str, endpoint_url: str | None):
+        self.bucket = bucket
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.endpoint_url = endpoint_url or None
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._bucket_ready = False
+        self._transfer_config = None
+
+    @property
+    def client(self):
+        """boto3 client, created on first use and shared by all worker threads."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    # boto3 is imported here, not at module level: it is the slowest
+                    # import in the app and the local backend never needs it
+                    import boto3
+                    from boto3.s3.transfer import TransferConfig
+                    from botocore.config import Config
+
+                    self._transfer_config = TransferConfig(
+                        multipart_threshold=STORAGE_MULTIPART_THRESHOLD,
+                        multipart_chunksize=STORAGE_MULTIPART_CHUNKSIZE,
+                        max_concurrency=STORAGE_MULTIPART_CONCURRENCY,
+                    )
+                    self._client = boto3.client(
+                        "s3",
+                        region_name=self.region,
+                        aws_access_key_id=self.access_key,
+                        aws_secret_access_key=self.secret_key,
+                        endpoint_url=self.endpoint_url,
+                        config=Config(max_pool_connections=STORAGE_MAX_POOL_CONNECTIONS),
+                    )
+        return self._client
+
+    def _ensure_bucket(self) -> bool:
+        """Create the bucket if missing. Returns True if it was created."""
+        from botocore.exceptions import ClientError
+
+        created = False
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+        except ClientError:
+            self.client.create_bucket(Bucket=self.bucket)
+            created = True
+        self._bucket_ready = True
+        return created
+
+    async def ensure_bucket(self) -> bool:
+        # Only the first call per process talks to S3
+        if self._bucket_ready:
+            return False
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="ensure_bucket"):
+            return await run_blocking(self._ensure_bucket)
+
+    async def upload_fileobj(self, file_obj, filename: str | None = None, key: str | None = None) -> str:
+        """Upload a file-like object under `key` (default: a fresh random key) and return the key."""
+        key = key or new_key(filename)
+        await self.ensure_bucket()
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="upload"):
+            await run_blocking(self._upload, file_obj, key)
+        return key
+
+    def _upload(self, file_obj, key: str):
+        client = self.client  # also builds self._transfer_config
+        client.upload_fileobj(file_obj, self.bucket, key, Config=self._transfer_config)
+
+    async def delete_many(self, keys) -> list[str]:
+        """Delete objects with multi-object DeleteObjects calls; returns the keys that failed."""
+        keys = [k for k in keys if k]
+        failed = []
+        for start in range(0, len(keys), S3_DELETE_BATCH):
+            chunk = keys[start:start + S3_DELETE_BATCH]
+            with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="delete"):
+                failed += await run_blocking(self._delete_batch, chunk)
+        return failed
+
+    def _delete_batch(self, keys: list[str]) -> list[str]:
+        # Quiet mode: the response only lists failures (a missing key is not one)
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True},
+        )
+        return [e["Key"] for e in response.get("Errors", [])]
+
+    async def list_objects(self):
+        """Yield pages of (key, last modified, size), in key (UTF-8 byte) order like ListObjectsV2."""
+        kwargs = {"Bucket": self.bucket, "MaxKeys": S3_LIST_PAGE}
+        while True:
+            with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="list"):
+                response = await run_blocking(self.client.list_objects_v2, **kwargs)
+            yield [(o["Key"], o["LastModified"], o["Size"]) for o in response.get("Contents", [])]
+            if not response.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
+
+    async def check(self):
+        """Readiness probe: raises if the bucket can't be reached."""
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="check"):
+            await run_blocking(lambda: self.client.head_bucket(Bucket=self.bucket))
+
+    def _sign(self, key: str, expires_in: int) -> str:
+        # Only cache misses get here; signing is local CPU work, no network call
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="presign"):
+            return self.client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": key},
+                ExpiresIn=expires_in,
+            )
+
+    def presigned_urls(self, keys, expires_in: int = 3600) -> dict:
+        return cached_presign(self.bucket, [k for k in keys if k], expires_in, lambda k: self._sign(k, expires_in))
+
+    def public_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{key}"
+
+# ----------------------
+# Local filesystem backend (dev / benchmarks, no LocalStack needed)
+# ----------------------
+class LocalStorage:
+    def __init__(self, bucket: str, root: str = LOCAL_STORAGE_ROOT, base_url: str = LOCAL_STORAGE_URL):
+        self.bucket = bucket
+        self.path = Path(root) / bucket
+        self.base_url = base_url.rstrip("/")
+
+    def _ensure_bucket(self) -> bool:
+        created = not self.path.exists()
+        self.path.mkdir(parents=True, exist_ok=True)
+        return created
+
+    async def ensure_bucket(self) -> bool:
+        return self._ensure_bucket()
+
+    async def check(self):
+        self._ensure_bucket()
+
+    def _write(self, file_obj, key: str):
+        self._ensure_bucket()
+        with open(self.path / key, "wb") as out:
+            shutil.copyfileobj(file_obj, out, STORAGE_MULTIPART_CHUNKSIZE)
+
+    async def upload_fileobj(self, file_obj, filename: str | None = None, key: str | None = None) -> str:
+        key = key or new_key(filename)
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="upload"):
+            await run_blocking(self._write, file_obj, key)
+        return key
+
+    def _delete_batch(self, keys: list[str]) -> list[str]:
+        failed = []
+        for key in keys:
+            try:
+                (self.path / key).unlink(missing_ok=True)
+            except OSError:
+                failed.append(key)
+        return failed
+
+    async def delete_many(self, keys) -> list[str]:
+        with timed(STORAGE_CALL_SECONDS, bucket=self.bucket, operation="delete"):
+            return await run_blocking(self._delete_batch, [k for k in keys if k])
+
+    def _list(self) -> list[tuple]:
+        if not self.path.exists():
+            return []
+        objects = []
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                objects.append((entry.name, datetime.fromtimestamp(stat.st_mtime, timezone.utc), stat.st_size))
+        return sorted(objects)
+
+    async def list_objects(self):
+        objects = await run_blocking(self._list)
+        for start in range(0, len(objects), S3_LIST_PAGE):
+            yield objects[start:start + S3_LIST_PAGE]
+
+    def presigned_urls(self, keys, expires_in: int = 3600) -> dict:
+        return {k: self.public_url(k) for k in keys if k}
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{self.bucket}/{key}"
+
+def create_storage(bucket: str, region: str, access_key: str, secret_key: str, endpoint_url: str | None):
+    """Build the storage backend selected by STORAGE_BACKEND for one bucket."""
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(bucket)
+    return S3Storage(bucket, region, access_key, secret_key, endpoint_url)
@@ -0,0 +1,116 @@
+# storage_gc.py
+"""
+Garbage collector for the blogs and careers buckets: deletes objects that no
+row points at (replaced images/resumes, deleted posts and careers).
+
+    python storage_gc.py --dry-run              # report only
+    python storage_gc.py [--bucket my-bucket] [--grace-hours 24]
+
+Memory stays flat whatever the bucket size. The bucket listing (key order) is
+merge-joined against the referenced keys, which the database streams in the
+same byte order. Objects younger than the grace period are kept: their row
+may not be committed yet. Orphans are deleted 1000 per request.
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import content_store
+import crud
+import models
+from database import SessionLocal, engine
+from storage import S3_DELETE_BATCH
+from s3_utils import storage as blogs_storage
+from aws_utils import storage as career_storage
+
+STORAGE_GC_GRACE_SECONDS = float(os.getenv("STORAGE_GC_GRACE_SECONDS", "86400"))
+
+def targets() -> dict:
+    """{bucket name: (storage, key columns)}; a bucket shared by blogs and careers is collected once."""
+    found = {}
+    for store, column in ((blogs_storage, models.Blog.image_url), (career_storage, models.Career.resume_url)):
+        found.setdefault(store.bucket, (store, []))[1].append(column)
+    return found
+
+async def find_orphans(listing, referenced, cutoff: datetime, report: dict):
+    """
+    Merge-join two key-ordered streams: yield (key, size) of listed objects
+    missing from `referenced` and last modified before `cutoff`.
+    """
+    ref = await anext(referenced, None)
+    async for page in listing:
+        for key, modified, size in page:
+            report["listed"] += 1
+            while ref is not None and ref < key:
+                ref = await anext(referenced, None)
+            if ref == key:
+                report["referenced"] += 1
+            elif modified >= cutoff:
+                report["too_recent"] += 1
+            else:
+                yield key, size
+
+async def collect(store, columns, grace_seconds: float, dry_run: bool, show: int = 20) -> dict:
+    """GC one bucket; returns its report (dry runs count orphans and list the first `show`)."""
+    report = {"bucket": store.bucket, "listed": 0, "referenced": 0, "too_recent": 0,
+              "orphaned": 0, "orphaned_bytes": 0, "deleted": 0, "failed": 0, "kept": 0, "sample": []}
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    batch = []
+
+    async def flush():
+        # Content-addressed keys are only deleted if their refcount row can be claimed
+        deleted, failed = await content_store.release(store, batch, grace_seconds)
+        report["deleted"] += len(deleted)
+        report["failed"] += len(failed)
+        report["kept"] += len(batch) - len(deleted) - len(failed)
+        batch.clear()
+
+    async with SessionLocal() as db:
+        referenced = crud.stream_referenced_keys(db, columns)
+        async for key, size in find_orphans(store.list_objects(), referenced, cutoff, report):
+            report["orphaned"] += 1
+            report["orphaned_bytes"] += size
+            if len(report["sample"]) < show:
+                report["sample"].append(key)
+            if not dry_run:
+                batch.append(key)
+                if len(batch) >= S3_DELETE_BATCH:
+                    await flush()
+        if batch:
+            await flush()
+    return report
+
+def print_report(report: dict, dry_run: bool):
+    mb = report["orphaned_bytes"] / (1024 * 1024)
+    print(
+        f"{report['bucket']}: {report['listed']} objects, {report['referenced']} referenced, "
+        f"{report['too_recent']} within grace period, {report['orphaned']} orphaned ({mb:.1f} MB)"
+        + ("" if dry_run else f", {report['deleted']} deleted, {report['failed']} failed, {report['kept']} still in use")
+    )
+    for key in report["sample"]:
+        print(f"  {'would delete' if dry_run else 'orphan'} {key}")
+    if report["orphaned"] > len(report["sample"]):
+        print(f"  ... and {report['orphaned'] - len(report['sample'])} more")
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Delete bucket objects no blog or career refers to.")
+    parser.add_argument("--dry-run", action="store_true", help="report orphans without deleting them")
+    parser.add_argument("--bucket", action="append", help="only this bucket (repeatable; default: all)")
+    parser.add_argument("--grace-hours", type=float, default=STORAGE_GC_GRACE_SECONDS / 3600,
+                        help="keep objects modified more recently than this")
+    parser.add_argument("--show", type=int, default=20, help="orphan keys to list per bucket")
+    args = parser.parse_args()
+
+    failed = False
+    for bucket, (store, columns) in targets().items():
+        if args.bucket and bucket not in args.bucket:
+            continue
+        report = await collect(store, columns, args.grace_hours * 3600, args.dry_run, args.show)
+        print_report(report, args.dry_run)
+        failed |= report["failed"] > 0
+    await engine.dispose()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
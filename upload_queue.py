@@ -0,0 +1,148 @@
+# upload_queue.py
+"""
+Write-behind uploads for the create endpoints (UPLOAD_MODE=background).
+
+The request only spools the file to local disk (hashing it on the way, see
+content_store.put_later) and commits its row with upload_status "pending";
+the response doesn't wait for S3. UPLOAD_WORKERS tasks per worker process
+then upload the spooled files, retrying with backoff, and settle the row as
+"stored" or "failed". Until then the row's presigned URL may 404.
+
+The queue is bounded (UPLOAD_QUEUE_SIZE): when it is full, requests wait for
+a slot, i.e. fall back to upload latency instead of filling the disk.
+
+drain() on shutdown gives queued uploads UPLOAD_DRAIN_TIMEOUT seconds (keep
+it below the container's stop grace period); whatever is left is marked
+"failed" so clients know to upload again. A process that dies outright
+leaves its rows "pending".
+"""
+import asyncio
+import os
+import tempfile
+
+import content_store
+from database import SessionLocal
+from metrics import STORAGE_UPLOADS, UPLOAD_QUEUE_DEPTH
+
+UPLOAD_MODE = os.getenv("UPLOAD_MODE", "sync").lower()  # "sync" (upload inside the request) or "background"
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))
+UPLOAD_QUEUE_SIZE = int(os.getenv("UPLOAD_QUEUE_SIZE", "100"))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "3"))  # attempts per file
+UPLOAD_RETRY_DELAY = float(os.getenv("UPLOAD_RETRY_DELAY", "1"))  # seconds before the 2nd attempt, doubling after
+UPLOAD_DRAIN_TIMEOUT = float(os.getenv("UPLOAD_DRAIN_TIMEOUT", "20"))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "upload-spool"))
+
+BACKGROUND = UPLOAD_MODE == "background"
+
+_queue: asyncio.Queue | None = None
+_workers: list[asyncio.Task] = []
+_settle_tasks = set()
+
+class _Upload:
+    """A spooled file waiting for storage, and the callback that settles its row."""
+
+    def __init__(self, store, key: str, path: str, on_done):
+        self.store = store
+        self.key = key
+        self.path = path
+        self.on_done = on_done  # async fn(db, status)
+        self.settled = False
+
+def discard(path: str | None):
+    """Remove a spool file that won't be enqueued (its row failed to commit)."""
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+async def spool(store, file_obj, filename: str | None) -> tuple[str, str | None]:
+    """(key, spool path to enqueue(), or None if the object is already stored)."""
+    return await content_store.put_later(store, file_obj, filename, UPLOAD_SPOOL_DIR)
+
+async def enqueue(store, key: str, path: str, on_done):
+    """
+    Upload a spooled file in the background, then `await on_done(db, status)`
+    with status "stored" or "failed". Waits while the queue is full; if the
+    request is cancelled meanwhile (client gone), the upload is settled as
+    "failed" since its row has already committed.
+    """
+    if _queue is None:
+        raise RuntimeError("upload_queue.start() has not been called")
+    item = _Upload(store, key, path, on_done)
+    UPLOAD_QUEUE_DEPTH.inc(bucket=store.bucket)
+    try:
+        await _queue.put(item)
+    except BaseException:
+        # In a task of its own: awaiting here would be cancelled along with the request
+        task = asyncio.create_task(_settle(item, "failed"))
+        _settle_tasks.add(task)
+        task.add_done_callback(_settle_tasks.discard)
+        raise
+
+async def _settle(item: _Upload, status: str):
+    if item.settled:
+        return
+    item.settled = True
+    discard(item.path)
+    UPLOAD_QUEUE_DEPTH.dec(bucket=item.store.bucket)
+    if status == "failed":
+        STORAGE_UPLOADS.inc(bucket=item.store.bucket, result="failed")
+    try:
+        async with SessionLocal() as db:
+            await item.on_done(db, status)
+    except Exception as e:
+        print(f"Could not record upload status '{status}' for {item.store.bucket}/{item.key}: {e}")
+
+async def _process(item: _Upload):
+    delay = UPLOAD_RETRY_DELAY
+    for attempt in range(1, UPLOAD_RETRIES + 1):
+        try:
+            await content_store.upload_spooled(item.store, item.key, item.path)
+        except Exception as e:
+            print(f"Upload of {item.store.bucket}/{item.key} failed (attempt {attempt}/{UPLOAD_RETRIES}): {e}")
+            if attempt < UPLOAD_RETRIES:
+                await asyncio.sleep(delay)
+                delay *= 2
+        else:
+            await _settle(item, "stored")
+            return
+    await _settle(item, "failed")
+
+async def _worker():
+    while True:
+        item = await _queue.get()
+        try:
+            await _process(item)
+        except asyncio.CancelledError:
+            # drain() timed out mid-upload
+            await _settle(item, "failed")
+            raise
+        finally:
+            _queue.task_done()
+
+def start():
+    """Start this process's upload workers (UPLOAD_MODE=background only)."""
+    global _queue
+    if not BACKGROUND or _workers:
+        return
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    _queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+    _workers.extend(asyncio.create_task(_worker()) for _ in range(UPLOAD_WORKERS))
+
+async def drain():
+    """Finish queued uploads (up to UPLOAD_DRAIN_TIMEOUT), then stop the workers."""
+    if not _workers:
+        return
+    try:
+        await asyncio.wait_for(_queue.join(), UPLOAD_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Upload queue not drained after {UPLOAD_DRAIN_TIMEOUT:.0f}s; marking the rest failed")
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    while not _queue.empty():
+        await _settle(_queue.get_nowait(), "failed")
+    if _settle_tasks:
+        await asyncio.gather(*_settle_tasks, return_exceptions=True)